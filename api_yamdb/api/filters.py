@@ -1,13 +1,46 @@
-from django_filters.rest_framework import CharFilter, FilterSet
+from django_filters.rest_framework import (CharFilter, DateTimeFilter,
+                                           FilterSet, NumberFilter)
 
-from reviews.models import Title
+from reviews.models import Comment, Review, Title
 
 
 class TitleFilter(FilterSet):
     """Фильтры для модели Title."""
     category = CharFilter(field_name='category__slug')
     genre = CharFilter(field_name='genre__slug')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         fields = ('category', 'genre', 'name', 'year',)
         model = Title
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск, лучшие совпадения первыми."""
+        return queryset.search(value)
+
+
+class ReviewSearchFilter(FilterSet):
+    """Поиск по текстам отзывов с фильтрами по произведению, автору и дате."""
+    q = CharFilter(method='filter_search', required=True)
+    title = NumberFilter(field_name='title_id')
+    author = CharFilter(field_name='author__username')
+    since = DateTimeFilter(field_name='pub_date', lookup_expr='gte')
+    until = DateTimeFilter(field_name='pub_date', lookup_expr='lte')
+
+    class Meta:
+        fields = ('q', 'title', 'author', 'since', 'until',)
+        model = Review
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск, лучшие совпадения первыми."""
+        return queryset.search(value)
+
+
+class CommentSearchFilter(ReviewSearchFilter):
+    """Поиск по текстам комментариев, дополнительно - по отзыву."""
+    title = NumberFilter(field_name='review__title_id')
+    review = NumberFilter(field_name='review_id')
+
+    class Meta:
+        fields = ('q', 'title', 'review', 'author', 'since', 'until',)
+        model = Comment
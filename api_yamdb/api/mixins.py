@@ -0,0 +1,219 @@
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.cache import LIST_CACHE_TIMEOUT, list_cache_key
+
+
+class NestedResourceMixin:
+    """
+    Вьюсет вложенного ресурса, например отзывов произведения.
+
+    Объекты выбираются одним запросом с фильтром по всей цепочке
+    родителей из URL, поэтому для списка и отдельного объекта родитель
+    отдельно не загружается. Если страница списка пуста, родитель
+    проверяется отдельным запросом, чтобы вернуть 404 для несуществующей
+    цепочки. Загруженный родитель запоминается на время запроса.
+    """
+    # Модель родителя, поле внешнего ключа на него и соответствие
+    # полей родителя параметрам URL.
+    parent_model = None
+    parent_field = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.parent_model, **{
+                field: self.kwargs[kwarg]
+                for field, kwarg in self.parent_lookups.items()
+            })
+        return self._parent
+
+    def filter_by_parent(self, queryset):
+        return queryset.filter(**{
+            f'{self.parent_field}__{field}': self.kwargs[kwarg]
+            for field, kwarg in self.parent_lookups.items()
+        })
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
+
+    def perform_create(self, serializer):
+        serializer.save(**{
+            'author': self.request.user,
+            self.parent_field: self.get_parent(),
+        })
+
+
+class SparseFieldsMixin:
+    """
+    Параметры запроса ?fields= и ?exclude= для чтения списка и отдельного
+    объекта: список полей через запятую, которые нужно оставить в ответе
+    или убрать из него. Лишние поля не попадают ни в ответ, ни в SQL.
+    Сериализатор должен принимать аргумент fields.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    read_actions = ('list', 'retrieve')
+
+    def get_query_param_fields(self, param):
+        value = self.request.query_params.get(param, '')
+        return [name.strip() for name in value.split(',') if name.strip()]
+
+    def get_requested_fields(self):
+        """
+        Поля ответа в порядке Meta.fields или None, если параметры
+        не переданы.
+        """
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = None
+            include = self.get_query_param_fields(self.fields_query_param)
+            exclude = self.get_query_param_fields(self.exclude_query_param)
+            if include or exclude:
+                available = self.get_serializer_class().Meta.fields
+                unknown = set(include + exclude).difference(available)
+                if unknown:
+                    raise ValidationError({
+                        self.fields_query_param: [
+                            'Unknown fields: '
+                            f'{", ".join(sorted(unknown))}.'
+                        ]
+                    })
+                self._requested_fields = tuple(
+                    name for name in available
+                    if (not include or name in include)
+                    and name not in exclude
+                )
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.read_actions:
+            kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in self.read_actions:
+            return self.narrow_queryset(
+                queryset, self.get_requested_fields()
+            )
+        return queryset
+
+    def narrow_queryset(self, queryset, fields):
+        """Загружает из БД только поля ответа."""
+        if fields is None:
+            return queryset
+        return queryset.only(*fields)
+
+
+class ValuesReadMixin(SparseFieldsMixin):
+    """
+    Вьюсет, который отдаёт список и отдельный объект через
+    read_serializer_class: ответ строится из строк QuerySet.values(),
+    а не из объектов моделей. Остальные действия используют
+    serializer_class.
+    """
+    read_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action in self.read_actions:
+            return self.read_serializer_class
+        return super().get_serializer_class()
+
+    def narrow_queryset(self, queryset, fields):
+        # Колонки курсора нужны пагинации, даже если их нет в ответе.
+        ordering = getattr(self, 'cursor_ordering', ())
+        return self.get_serializer_class().get_values(
+            queryset, fields, [name.lstrip('-') for name in ordering]
+        )
+
+
+class CachedListMixin:
+    """
+    Кеширует данные ответа list в кеше Django по полному URL запроса
+    и версии модели. Повторный запрос того же списка не обращается к БД.
+    Версию увеличивают сигналы сохранения и удаления объектов модели.
+    """
+    list_cache_timeout = LIST_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        key = list_cache_key(self.get_queryset().model, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, self.list_cache_timeout)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Условный GET для списка и отдельного объекта: заголовки ETag и
+    Last-Modified строятся по полю updated_at, а на запросы с
+    If-None-Match и If-Modified-Since, если данные не изменились,
+    возвращается 304 после одного запроса к БД, без сериализации.
+
+    Удаление строки не меняет наибольший updated_at списка, поэтому
+    для списков отдаётся только ETag (он учитывает число строк),
+    а If-Modified-Since не проверяется.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_conditional_queryset(self):
+        """Строки, по которым определяется, изменился ли ответ."""
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return self.filter_queryset(self.get_queryset())
+
+    def get_conditional_validators(self):
+        """
+        ETag и время изменения ответа или None, если строк нет.
+        Число строк в ETag меняет его и при удалении объектов.
+        """
+        state = self.get_conditional_queryset().order_by().aggregate(
+            updated_at=Max('updated_at'), count=Count('pk')
+        )
+        if state['updated_at'] is None:
+            return None
+        updated_at = state['updated_at']
+        etag = quote_etag(f'{state["count"]}-{updated_at.timestamp():f}')
+        return f'W/{etag}', updated_at
+
+    def handle_conditional(self, handler, request, *args, **kwargs):
+        validators = self.get_conditional_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        etag, updated_at = validators
+        last_modified = None
+        if self.action == 'retrieve':
+            last_modified = int(updated_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.handle_conditional(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.handle_conditional(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,50 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Пагинация limit/offset по умолчанию и курсорная (keyset) пагинация,
+    если в запросе передан параметр `cursor` (для первой страницы - пустой).
+    Курсорная страница не считает COUNT(*) и не сканирует OFFSET строк,
+    поэтому время выборки не зависит от глубины страницы.
+    Порядок курсора задаётся атрибутом `cursor_ordering` вьюсета.
+    """
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-id',)
+
+    def get_cursor_paginator(self, view):
+        paginator = CursorPagination()
+        paginator.ordering = getattr(
+            view, 'cursor_ordering', self.cursor_ordering
+        )
+        paginator.cursor_query_param = self.cursor_query_param
+        paginator.page_size = self.default_limit
+        paginator.page_size_query_param = self.limit_query_param
+        paginator.max_page_size = self.max_limit
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.get_cursor_paginator(view)
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class SearchCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация результатов полнотекстового поиска: лучшие
+    совпадения первыми, следующая страница выбирается условием на
+    релевантность, а не OFFSET. Нужна аннотация search_rank из
+    FullTextSearchQuerySet.search.
+    """
+    ordering = ('search_rank', 'id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
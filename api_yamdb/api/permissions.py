@@ -27,3 +27,10 @@ class IsAuthorOrModeratorOrAdminOrReadOnly(permissions.BasePermission):
                 or obj.author == request.user
                 or request.user.is_moderator
                 or request.user.is_admin)
+
+
+class IsModeratorOrAdmin(permissions.BasePermission):
+    """Доступ только для модератора и админа (в т.ч. суперюзера)."""
+    def has_permission(self, request, view):
+        return (request.user.is_authenticated
+                and (request.user.is_moderator or request.user.is_admin))
@@ -1,9 +1,12 @@
 import datetime
+from collections import defaultdict
+from operator import itemgetter
 
 from rest_framework.relations import SlugRelatedField
-from rest_framework.serializers import (CharField, EmailField, ModelSerializer,
-                                        Serializer, ValidationError,
-                                        IntegerField,)
+from rest_framework.serializers import (CharField, DateTimeField, EmailField,
+                                        IntegerField, ListSerializer,
+                                        ModelSerializer, Serializer,
+                                        ValidationError)
 
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
@@ -33,7 +36,10 @@ class TitleSerializer(ModelSerializer):
     rating = IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'description', 'genre',
+            'category',
+        )
         model = Title
 
 
@@ -46,7 +52,9 @@ class TitleWriteSerializer(ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'description', 'genre', 'category',
+        )
         model = Title
 
     def validate_year(self, year):
@@ -65,16 +73,6 @@ class ReviewSerializer(ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
         model = Review
 
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            user = self.context['request'].user
-            title_id = self.context['view'].kwargs.get('title_id')
-            if user.reviews.filter(title__id=title_id).exists():
-                raise ValidationError(
-                    'For every title only one review per user is allowed.'
-                )
-        return data
-
 
 class CommentSerializer(ModelSerializer):
     """Сериализатор коментариев."""
@@ -85,7 +83,170 @@ class CommentSerializer(ModelSerializer):
         model = Comment
 
 
-class UserSerializer(ModelSerializer):
+class ReviewSearchSerializer(ReviewSerializer):
+    """Найденный отзыв: с произведением, к которому он относится."""
+    title = IntegerField(source='title_id', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date',)
+
+
+class CommentSearchSerializer(CommentSerializer):
+    """Найденный комментарий: с отзывом и произведением."""
+    title = IntegerField(source='review.title_id', read_only=True)
+    review = IntegerField(source='review_id', read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = ('id', 'title', 'review', 'text', 'author', 'pub_date',)
+
+
+# Поле используется только для форматирования дат так же, как в
+# ModelSerializer, к сериализатору оно не привязывается.
+DATETIME_FIELD = DateTimeField()
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Принимает аргумент fields: поля из Meta.fields, которые нужно
+    оставить в ответе. По умолчанию в ответе все поля.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested_fields = tuple(
+            self.Meta.fields if fields is None else fields
+        )
+
+    def get_fields(self):
+        return {
+            name: field for name, field in super().get_fields().items()
+            if name in self.requested_fields
+        }
+
+
+class ValuesListSerializer(ListSerializer):
+    """Сериализует страницу строк values() целиком, одной пачкой."""
+
+    def to_representation(self, data):
+        return self.child.represent_rows(list(data))
+
+
+class ValuesSerializerMixin(SparseFieldsSerializerMixin):
+    """
+    Быстрое чтение: строит тот же JSON, что и родительский ModelSerializer,
+    прямо из строк QuerySet.values(), без создания объектов моделей и
+    вызова to_representation каждого поля для каждой строки.
+    Поля родителя остаются для форм browsable API и схемы.
+
+    values_fields задаёт для каждого поля ответа колонки values(), из
+    которых оно строится. Значение поля берётся из первой колонки, если
+    у сериализатора нет метода represent_<поле>.
+    """
+    values_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.getters = {
+            name: getattr(self, f'represent_{name}', None)
+            or itemgetter(self.values_fields[name][0])
+            for name in self.requested_fields
+        }
+
+    @classmethod
+    def get_values(cls, queryset, fields=None, required=()):
+        """
+        Строки values() с колонками, нужными для полей fields,
+        и обязательными колонками required, например для сортировки.
+        """
+        columns = dict.fromkeys(required)
+        for name in cls.Meta.fields if fields is None else fields:
+            columns.update(dict.fromkeys(cls.values_fields[name]))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def to_representation(self, row):
+        return self.represent_rows([row])[0]
+
+    def represent_rows(self, rows):
+        getters = self.getters.items()
+        return [
+            {name: getter(row) for name, getter in getters} for row in rows
+        ]
+
+
+class TitleReadSerializer(ValuesSerializerMixin, TitleSerializer):
+    """
+    Быстрое чтение произведений. Жанры всей страницы выбираются одним
+    запросом той же формы, что и prefetch_related('genre'), и только
+    если поле genre есть в ответе.
+    """
+    values_fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'description': ('description',),
+        'genre': ('id',),
+        'category': ('category__name', 'category__slug'),
+    }
+
+    class Meta(TitleSerializer.Meta):
+        list_serializer_class = ValuesListSerializer
+
+    def represent_rows(self, rows):
+        self.genres = defaultdict(list)
+        if rows and 'genre' in self.requested_fields:
+            for genre in Genre.objects.filter(
+                title__in=[row['id'] for row in rows]
+            ).values('title', 'name', 'slug'):
+                self.genres[genre.pop('title')].append(genre)
+        return super().represent_rows(rows)
+
+    def represent_rating(self, row):
+        return None if row['rating'] is None else int(row['rating'])
+
+    def represent_genre(self, row):
+        return self.genres[row['id']]
+
+    def represent_category(self, row):
+        if row['category__slug'] is None:
+            return None
+        return {'name': row['category__name'], 'slug': row['category__slug']}
+
+
+class ReviewReadSerializer(ValuesSerializerMixin, ReviewSerializer):
+    """Быстрое чтение отзывов."""
+    values_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+
+    class Meta(ReviewSerializer.Meta):
+        list_serializer_class = ValuesListSerializer
+
+    def represent_pub_date(self, row):
+        return DATETIME_FIELD.to_representation(row['pub_date'])
+
+
+class CommentReadSerializer(ValuesSerializerMixin, CommentSerializer):
+    """Быстрое чтение комментариев."""
+    values_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+
+    class Meta(CommentSerializer.Meta):
+        list_serializer_class = ValuesListSerializer
+
+    def represent_pub_date(self, row):
+        return DATETIME_FIELD.to_representation(row['pub_date'])
+
+
+class UserSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     """Сериализатор рользователей."""
     class Meta:
         fields = (
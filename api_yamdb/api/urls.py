@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_token,
-                    me_view, user_signup)
+from .views import (CategoryViewSet, CommentSearchViewSet, CommentViewSet,
+                    GenreViewSet, ReviewSearchViewSet, ReviewViewSet,
+                    TitleViewSet, UserViewSet, get_token, me_view,
+                    user_signup)
 
 app_name = 'api'
 
@@ -20,6 +21,12 @@ router.register(
     basename='comment'
 )
 router.register('titles', TitleViewSet, basename='title')
+router.register(
+    'search/reviews', ReviewSearchViewSet, basename='search-review'
+)
+router.register(
+    'search/comments', CommentSearchViewSet, basename='search-comment'
+)
 router.register('users', UserViewSet, basename='user')
 
 registration_urlpatterns = [
@@ -29,6 +36,6 @@ registration_urlpatterns = [
 
 urlpatterns = [
     path('v1/', include(registration_urlpatterns)),
-    path('v1/users/me/', me_view),
+    path('v1/users/me/', me_view, name='me'),
     path('v1/', include(router.urls)),
 ]
@@ -1,28 +1,35 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Title
+from core.mail import enqueue_mail
+from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
-from .filters import TitleFilter
+from .filters import CommentSearchFilter, ReviewSearchFilter, TitleFilter
+from .mixins import (CachedListMixin, ConditionalGetMixin,
+                     NestedResourceMixin, SparseFieldsMixin,
+                     ValuesReadMixin)
+from .pagination import LimitOffsetOrCursorPagination, SearchCursorPagination
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
-                          IsAuthorOrModeratorOrAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
+                          IsAuthorOrModeratorOrAdminOrReadOnly,
+                          IsModeratorOrAdmin)
+from .serializers import (CategorySerializer, CommentReadSerializer,
+                          CommentSearchSerializer, CommentSerializer,
                           GenreSerializer, GetTokenSerializer, MeSerializer,
-                          RegistrationSerializer, ReviewSerializer,
-                          TitleSerializer, TitleWriteSerializer,
+                          RegistrationSerializer, ReviewReadSerializer,
+                          ReviewSearchSerializer, ReviewSerializer,
+                          TitleReadSerializer, TitleWriteSerializer,
                           UserSerializer)
 
 
@@ -33,7 +40,7 @@ class ListCreateDestroyViewSet(mixins.ListModelMixin,
     pass
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(CachedListMixin, ListCreateDestroyViewSet):
     """
     Вьюсет для просмотра, создания и удаления категорий.
     Пользователи с правами администратора могут создавать,
@@ -48,7 +55,7 @@ class CategoryViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(CachedListMixin, ListCreateDestroyViewSet):
     """
     Только пользователи с правами администратора могут выполнять
     действия, которые изменяют данные (POST, PUT, PATCH, DELETE).
@@ -62,79 +69,148 @@ class GenreViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(ListCreateDestroyViewSet, mixins.RetrieveModelMixin,
+class TitleViewSet(ConditionalGetMixin, ValuesReadMixin,
+                   ListCreateDestroyViewSet, mixins.RetrieveModelMixin,
                    mixins.UpdateModelMixin):
     """
     Любой пользователь может просматривать данные объекта,
     но только администраторы могут вносить изменения.
     """
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
-    serializer_class = TitleSerializer
+    queryset = (Title.objects.select_related('category')
+                .prefetch_related('genre'))
+    serializer_class = TitleWriteSerializer
+    read_serializer_class = TitleReadSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('id',)
+    read_actions = ('list', 'retrieve', 'top', 'trending')
+    # Порядок списков лучших и популярных: оценки хранятся в полях
+    # произведения и обновляются вместе с рейтингом, без агрегации отзывов.
+    ranking_orderings = {
+        'top': ('-top_score', 'id'),
+        'trending': ('-trending_score', 'id'),
+    }
 
-    def get_serializer_class(self):
-        if self.action in ['list', 'retrieve']:
-            return TitleSerializer
-        return TitleWriteSerializer
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'top':
+            return queryset.top()
+        if self.action == 'trending':
+            return queryset.trending()
+        return queryset
+
+    def ranked_list(self, request):
+        self.cursor_ordering = self.ranking_orderings[self.action]
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        return self.get_paginated_response(
+            self.get_serializer(page, many=True).data
+        )
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие произведения по байесовскому среднему оценок."""
+        return self.ranked_list(request)
+
+    @action(detail=False)
+    def trending(self, request):
+        """Произведения, которые чаще всего обсуждают в последнее время."""
+        return self.ranked_list(request)
 
 
-class ReviewViewSet(ListCreateDestroyViewSet, mixins.RetrieveModelMixin,
-                    mixins.UpdateModelMixin):
+class ReviewViewSet(NestedResourceMixin, ConditionalGetMixin,
+                    ValuesReadMixin, ListCreateDestroyViewSet,
+                    mixins.RetrieveModelMixin, mixins.UpdateModelMixin):
     """
     Только зарегистрированные пользователи могут создавать, просматривать,
     обновлять и удалять отзывы.
     """
 
     serializer_class = ReviewSerializer
+    read_serializer_class = ReviewReadSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorOrModeratorOrAdminOrReadOnly
     )
-
-    def get_title(self, **kwargs):
-        title_id = kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = {'pk': 'title_id'}
 
     def get_queryset(self):
-        title = self.get_title(**self.kwargs)
-        return title.reviews.all()
+        return self.filter_by_parent(Review.objects.select_related('author'))
+
+    def get_conditional_queryset(self):
+        # Дата изменения произведения меняется при любом изменении
+        # его отзывов, поэтому для списка достаточно строки произведения.
+        if self.action == 'list':
+            return Title.objects.filter(pk=self.kwargs['title_id'])
+        return super().get_conditional_queryset()
 
     def perform_create(self, serializer):
-        title = self.get_title(**self.kwargs)
-        serializer.save(author=self.request.user, title=title)
+        # Повторный отзыв отклоняет ограничение unique_review в БД,
+        # без отдельного запроса на проверку.
+        try:
+            super().perform_create(serializer)
+        except IntegrityError:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'For every title only one review per user is allowed.'
+                ]
+            })
 
 
-class CommentViewSet(ListCreateDestroyViewSet, mixins.RetrieveModelMixin,
-                     mixins.UpdateModelMixin):
+class CommentViewSet(NestedResourceMixin, ConditionalGetMixin,
+                     ValuesReadMixin, ListCreateDestroyViewSet,
+                     mixins.RetrieveModelMixin, mixins.UpdateModelMixin):
     """
     Только аутентифицированные пользователи могут взаимодействовать
     с комментариями.
     """
     serializer_class = CommentSerializer
+    read_serializer_class = CommentReadSerializer
 
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorOrModeratorOrAdminOrReadOnly
     )
-
-    def get_review(self, **kwargs):
-        title_id = kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        review_id = kwargs.get('review_id')
-        return get_object_or_404(title.reviews, id=review_id)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
 
     def get_queryset(self):
-        review = self.get_review(**self.kwargs)
-        return review.comments.all()
+        return self.filter_by_parent(
+            Comment.objects.select_related('author')
+        )
 
-    def perform_create(self, serializer):
-        review = self.get_review(**self.kwargs)
-        serializer.save(author=self.request.user, review=review)
+
+class ReviewSearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Полнотекстовый поиск по отзывам для модераторов и администраторов.
+    Результаты упорядочены по релевантности, страницы - курсорные.
+    """
+    queryset = Review.objects.select_related('author')
+    serializer_class = ReviewSearchSerializer
+    permission_classes = (IsModeratorOrAdmin,)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = ReviewSearchFilter
+    pagination_class = SearchCursorPagination
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class CommentSearchViewSet(ReviewSearchViewSet):
+    """Полнотекстовый поиск по комментариям для модераторов и админов."""
+    queryset = Comment.objects.select_related('author', 'review')
+    serializer_class = CommentSearchSerializer
+    filterset_class = CommentSearchFilter
+
+
+class UserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """
     Только администраторы могут просматривать, создавать
     и обновлять пользователей.
@@ -146,6 +222,8 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('^username',)
     lookup_field = 'username'
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('id',)
 
 
 @api_view(['GET', 'PATCH'])
@@ -167,7 +245,10 @@ def me_view(request):
 
 @api_view(('POST',))
 def user_signup(request):
-    """Регистрация users, генерация и отправка кода на почту"""
+    """
+    Регистрация users, генерация кода и постановка письма с ним
+    в очередь исходящей почты.
+    """
     serializer = RegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     try:
@@ -177,7 +258,7 @@ def user_signup(request):
             'username или email уже используются', status.HTTP_400_BAD_REQUEST
         )
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue_mail(
         subject='Регистрация на Yamdb.',
         message=f'Ваш код подтверждения: {confirmation_code}',
         from_email=settings.DEFAULT_FROM_EMAIL,
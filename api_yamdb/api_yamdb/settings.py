@@ -34,6 +34,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -64,6 +65,39 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: имена баз из DATABASES, которые
+# ReplicaRouter использует для безопасных запросов к API.
+DATABASE_REPLICAS = []
+
+# Сколько секунд после изменения данных клиент читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Кеш общий для всех процессов сервера: в нём хранятся версии, по которым
+# сбрасываются кеш аутентификации и кеш списков. Кеш в памяти процесса
+# (LocMemCache) запрещён проверкой users.E001: сброс в одном процессе
+# не виден остальным. Если серверов несколько, укажите Memcached или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# PRAGMA, выполняемые при открытии каждого соединения с SQLite.
+# WAL позволяет читать во время записи, busy_timeout (мс) заставляет
+# ждать освобождения блокировки вместо ошибки "database is locked".
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,7 +135,18 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
@@ -0,0 +1,65 @@
+"""
+Версионированный кеш списков.
+
+Для каждой модели в кеше хранится счётчик версии. Ключ закешированного
+ответа включает текущую версию, поэтому после изменения данных счётчик
+увеличивается, и старые записи просто перестают использоваться, а не
+удаляются по одной. Подходит для любого бэкенда кеша Django, включая
+локальную память и файловый.
+"""
+import time
+from hashlib import sha1
+
+from django.core.cache import cache
+from django.db import router, transaction
+
+LIST_CACHE_TIMEOUT = 60 * 60
+
+
+def version_key(model):
+    return f'list-version:{model._meta.label_lower}'
+
+
+def get_version(model):
+    """
+    Текущая версия данных модели. Если счётчика нет в кеше (первый запрос
+    или вытеснение), он начинается с текущего времени в наносекундах,
+    чтобы не совпасть с версиями уже закешированных ответов.
+    """
+    key = version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(model):
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def invalidate_list(*models):
+    """
+    Увеличивает версии моделей сразу, чтобы изменение было видно внутри
+    транзакции, и ещё раз после её фиксации: иначе запрос, прочитавший
+    данные до фиксации, оставил бы их в кеше с новой версией.
+    """
+    for model in models:
+        bump_version(model)
+        transaction.on_commit(lambda model=model: bump_version(model))
+
+
+def list_cache_key(model, request):
+    """
+    Ключ ответа: версия модели, база, из которой читается список,
+    и полный URL запроса с параметрами. База нужна, чтобы клиент,
+    привязанный к основной базе после записи, не получил из кеша
+    устаревший ответ реплики.
+    """
+    url = sha1(request.build_absolute_uri().encode()).hexdigest()
+    using = router.db_for_read(model)
+    return f'list:{model._meta.label_lower}:{using}:{get_version(model)}:{url}'
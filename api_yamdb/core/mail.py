@@ -0,0 +1,130 @@
+"""
+Очередь исходящей почты.
+
+Обработчики запросов не отправляют письма сами, а сохраняют их в таблицу
+OutgoingEmail. Команда send_queued_mail отправляет письма из очереди
+пачками через одно соединение с почтовым сервером и повторяет неудачные
+попытки с экспоненциальной задержкой.
+
+Несколько обработчиков могут работать одновременно: перед отправкой
+каждый забирает пачку писем условным UPDATE, который сдвигает время
+следующей попытки на CLAIM_TIMEOUT и записывает метку обработчика.
+Письма, забранные другим обработчиком, под условие уже не попадают,
+а если обработчик упал, письма вернутся в очередь по истечении
+CLAIM_TIMEOUT.
+"""
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+
+BATCH_SIZE = 100
+
+MAX_ATTEMPTS = 5
+
+RETRY_DELAY = timedelta(minutes=1)
+
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+# Время, на которое обработчик забирает пачку писем. Должно с запасом
+# превышать время отправки пачки, иначе письмо может уйти дважды.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь. Аргументы те же, что у send_mail."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipients='\n'.join(recipient_list),
+    )
+
+
+def retry_delay(attempts: int):
+    """Задержка перед следующей попыткой: 1, 2, 4... минуты, не больше часа."""
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def schedule_retry(email: OutgoingEmail, error: Exception, now):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def send_email(connection, email: OutgoingEmail, now):
+    """Отправляет письмо через уже открытое соединение."""
+    try:
+        connection.send_messages([EmailMessage(
+            subject=email.subject,
+            body=email.message,
+            from_email=email.from_email,
+            to=email.recipients.splitlines(),
+            connection=connection,
+        )])
+    except Exception as error:
+        schedule_retry(email, error, now)
+    else:
+        email.attempts += 1
+        email.sent_at = timezone.now()
+        email.last_error = ''
+
+
+def claim_emails(batch_size, max_attempts, now):
+    """
+    Забирает на отправку до batch_size писем, время попытки которых
+    наступило, и возвращает их. Повторная проверка условий в UPDATE
+    не даёт двум обработчикам забрать одно письмо.
+    """
+    due = Q(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now,
+        attempts__lt=max_attempts,
+    )
+    ids = list(
+        OutgoingEmail.objects.filter(due)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    token = uuid4().hex
+    OutgoingEmail.objects.filter(due, id__in=ids).update(
+        next_attempt_at=now + CLAIM_TIMEOUT, claimed_by=token
+    )
+    return list(
+        OutgoingEmail.objects.filter(id__in=ids, claimed_by=token)
+        .order_by('next_attempt_at', 'id')
+    )
+
+
+def deliver_queued_mail(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Забирает и отправляет одну пачку писем, время попытки которых
+    наступило. Возвращает число отправленных и неотправленных писем.
+    """
+    now = timezone.now()
+    emails = claim_emails(batch_size, max_attempts, now)
+    if not emails:
+        return 0, 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            schedule_retry(email, error, now)
+    else:
+        try:
+            for email in emails:
+                send_email(connection, email, now)
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(
+        emails, ['attempts', 'next_attempt_at', 'sent_at', 'last_error']
+    )
+    sent = sum(email.sent_at is not None for email in emails)
+    return sent, len(emails) - sent
@@ -0,0 +1,535 @@
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (DEFAULT_DB_ALIAS, OperationalError, connection,
+                       connections)
+from django.db.utils import load_backend
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.wsgi import application
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+REQUESTS = 50
+
+WARMUP = 5
+
+THRESHOLD = 0.2
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+# Длительность (с) и число потоков параллельной нагрузки на базу.
+LOAD_SECONDS = 2.0
+LOAD_READERS = 4
+LOAD_WRITERS = 4
+
+# Суффикс имени копии базы для СУБД, кроме SQLite.
+COPY_SUFFIX = 'benchmark'
+
+# Сценарий: (метод, имя маршрута, роль, параметры URL, параметры запроса,
+# тело запроса). Параметры и тело могут быть функциями от контекста
+# и номера запроса i. Сценарии выполняются по порядку, поэтому DELETE
+# удаляет объект, созданный i-м POST-запросом того же маршрута.
+SCENARIOS = [
+    ('get', 'api:api-root', None, None, None, None),
+    ('post', 'api:sign_up', None, None, None, lambda context, i: {
+        'username': f'bench_signup_{i}',
+        'email': f'bench_signup_{i}@yamdb.fake',
+    }),
+    ('post', 'api:get_token', None, None, None, lambda context, i: {
+        'username': context['user'].username,
+        'confirmation_code': context['confirmation_code'],
+    }),
+    ('get', 'api:me', 'user', None, None, None),
+    ('patch', 'api:me', 'user', None, None,
+     lambda context, i: {'bio': f'bio {i}'}),
+    ('get', 'api:category-list', None, None, None, None),
+    ('post', 'api:category-list', 'admin', None, None, lambda context, i: {
+        'name': f'Категория {i}', 'slug': f'bench-category-{i}',
+    }),
+    ('delete', 'api:category-detail', 'admin',
+     lambda context, i: {'slug': f'bench-category-{i}'}, None, None),
+    ('get', 'api:genre-list', None, None, None, None),
+    ('post', 'api:genre-list', 'admin', None, None, lambda context, i: {
+        'name': f'Жанр {i}', 'slug': f'bench-genre-{i}',
+    }),
+    ('delete', 'api:genre-detail', 'admin',
+     lambda context, i: {'slug': f'bench-genre-{i}'}, None, None),
+    ('get', 'api:title-list', None, None, None, None),
+    ('get', 'api:title-list', None, None,
+     lambda context, i: {'genre': context['genre'].slug}, None),
+    ('get', 'api:title-list', None, None,
+     lambda context, i: {'category': context['category'].slug}, None),
+    ('get', 'api:title-list', None, None,
+     lambda context, i: {'year': context['title'].year}, None),
+    ('get', 'api:title-list', None, None,
+     lambda context, i: {'name': context['title'].name}, None),
+    ('get', 'api:title-top', None, None, None, None),
+    ('get', 'api:title-top', None, None,
+     lambda context, i: {'genre': context['genre'].slug}, None),
+    ('get', 'api:title-trending', None, None, None, None),
+    ('post', 'api:title-list', 'admin', None, None, lambda context, i: {
+        'name': f'Произведение {i}', 'year': 2000,
+        'category': context['category'].slug,
+        'genre': [context['genre'].slug],
+    }),
+    ('get', 'api:title-detail', None,
+     lambda context, i: {'pk': context['title'].pk}, None, None),
+    ('patch', 'api:title-detail', 'admin',
+     lambda context, i: {'pk': context['title'].pk}, None,
+     lambda context, i: {'description': f'Описание {i}'}),
+    ('get', 'api:review-list', None,
+     lambda context, i: {'title_id': context['title'].pk}, None, None),
+    ('post', 'api:review-list', 'user',
+     lambda context, i: {
+         'title_id': context['created']['api:title-list'][i]['id']
+     }, None, lambda context, i: {'text': f'Отзыв {i}', 'score': 7}),
+    ('get', 'api:review-detail', None,
+     lambda context, i: {'title_id': context['title'].pk,
+                         'pk': context['review'].pk}, None, None),
+    ('patch', 'api:review-detail', 'moderator',
+     lambda context, i: {'title_id': context['title'].pk,
+                         'pk': context['review'].pk},
+     None, lambda context, i: {'score': i % 10 + 1}),
+    ('get', 'api:comment-list', None,
+     lambda context, i: {'title_id': context['title'].pk,
+                         'review_id': context['review'].pk}, None, None),
+    ('post', 'api:comment-list', 'user',
+     lambda context, i: {
+         'title_id': context['created']['api:title-list'][i]['id'],
+         'review_id': context['created']['api:review-list'][i]['id'],
+     }, None, lambda context, i: {'text': f'Комментарий {i}'}),
+    ('get', 'api:comment-detail', None,
+     lambda context, i: {'title_id': context['title'].pk,
+                         'review_id': context['review'].pk,
+                         'pk': context['comment'].pk}, None, None),
+    ('patch', 'api:comment-detail', 'moderator',
+     lambda context, i: {'title_id': context['title'].pk,
+                         'review_id': context['review'].pk,
+                         'pk': context['comment'].pk},
+     None, lambda context, i: {'text': f'Комментарий {i}'}),
+    ('get', 'api:search-review-list', 'moderator', None,
+     lambda context, i: {'q': context['review'].text.split()[0]}, None),
+    ('get', 'api:search-comment-list', 'moderator', None,
+     lambda context, i: {'q': context['comment'].text.split()[0]}, None),
+    ('delete', 'api:comment-detail', 'moderator',
+     lambda context, i: {
+         'title_id': context['created']['api:title-list'][i]['id'],
+         'review_id': context['created']['api:review-list'][i]['id'],
+         'pk': context['created']['api:comment-list'][i]['id'],
+     }, None, None),
+    ('delete', 'api:review-detail', 'moderator',
+     lambda context, i: {
+         'title_id': context['created']['api:title-list'][i]['id'],
+         'pk': context['created']['api:review-list'][i]['id'],
+     }, None, None),
+    ('delete', 'api:title-detail', 'admin',
+     lambda context, i: {
+         'pk': context['created']['api:title-list'][i]['id']
+     }, None, None),
+    ('get', 'api:user-list', 'admin', None, None, None),
+    ('post', 'api:user-list', 'admin', None, None, lambda context, i: {
+        'username': f'bench_created_{i}',
+        'email': f'bench_created_{i}@yamdb.fake',
+    }),
+    ('get', 'api:user-detail', 'admin',
+     lambda context, i: {'username': context['user'].username}, None, None),
+    ('patch', 'api:user-detail', 'admin',
+     lambda context, i: {'username': context['user'].username}, None,
+     lambda context, i: {'bio': f'bio {i}'}),
+    ('delete', 'api:user-detail', 'admin',
+     lambda context, i: {'username': f'bench_created_{i}'}, None, None),
+]
+
+
+def resolve(value, context, i):
+    return value(context, i) if callable(value) else value
+
+
+def scenario_label(scenario, context):
+    method, name, _, _, params, _ = scenario
+    label = f'{method.upper()} {name}'
+    params = resolve(params, context, 0)
+    if params:
+        label += ' ?' + ','.join(sorted(params))
+    return label
+
+
+def percentile(samples: list, share: float):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(share / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies: list):
+    total = sum(latencies)
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / total, 1),
+        'mean_ms': round(total / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def concurrent_load(settings_dict: dict, read: tuple, write: tuple,
+                    seconds: float, readers=LOAD_READERS,
+                    writers=LOAD_WRITERS):
+    """
+    В течение seconds секунд читает и пишет в базу из нескольких потоков,
+    у каждого из которых своё соединение. read и write - SQL-запрос
+    и его параметры; каждая запись фиксируется сразу. Возвращает число
+    чтений, записей и ошибок "database is locked".
+    """
+    stop = time.monotonic() + seconds
+
+    def worker(sql, params):
+        database = load_backend(settings_dict['ENGINE']).DatabaseWrapper(
+            settings_dict, DEFAULT_DB_ALIAS
+        )
+        done = locked = 0
+        try:
+            while time.monotonic() < stop:
+                try:
+                    with database.cursor() as cursor:
+                        cursor.execute(sql, params)
+                        cursor.fetchall()
+                    done += 1
+                except OperationalError as error:
+                    if 'locked' not in str(error):
+                        raise
+                    locked += 1
+        finally:
+            database.close()
+        return done, locked
+
+    with ThreadPoolExecutor(max_workers=readers + writers) as executor:
+        reads = [executor.submit(worker, *read) for _ in range(readers)]
+        writes = [executor.submit(worker, *write) for _ in range(writers)]
+    reads = [future.result() for future in reads]
+    writes = [future.result() for future in writes]
+    return {
+        'reads': sum(done for done, _ in reads),
+        'writes': sum(done for done, _ in writes),
+        'locked': sum(locked for _, locked in reads + writes),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks every api route in-process through the WSGI '
+        'application and reports throughput and latency percentiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=REQUESTS,
+            help='Number of measured requests per endpoint',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=WARMUP,
+            help='Number of unmeasured requests per endpoint',
+        )
+        parser.add_argument(
+            '--load-seconds',
+            type=float,
+            default=LOAD_SECONDS,
+            help='Duration of the concurrent read/write load, 0 to skip it',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='File the results are saved to as JSON',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON results of a previous run to compare with',
+        )
+        parser.add_argument(
+            '--metric',
+            choices=METRICS,
+            default='p95_ms',
+            help='Latency compared with the baseline',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=THRESHOLD,
+            help='Relative slowdown reported as a regression',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be a positive number')
+        if options['warmup'] < 0:
+            raise CommandError('--warmup must not be negative')
+        if options['load_seconds'] < 0:
+            raise CommandError('--load-seconds must not be negative')
+        baseline = None
+        if options['baseline']:
+            baseline = json.loads(
+                Path(options['baseline']).read_text(encoding='utf-8')
+            )
+        results = {
+            'meta': {
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'database': connection.vendor,
+                'dataset': {
+                    model.__name__: model.objects.count()
+                    for model in (Category, Genre, User, Title, Review,
+                                  Comment)
+                },
+            },
+            **self.run(options['requests'], options['warmup'],
+                       options['load_seconds']),
+        }
+        Path(options['output']).write_text(
+            json.dumps(results, ensure_ascii=False, indent=2),
+            encoding='utf-8'
+        )
+        self.stdout.write(f'Results saved to {options["output"]}')
+        if baseline is not None:
+            self.compare(baseline['endpoints'], results['endpoints'],
+                         options['metric'], options['threshold'])
+
+    def run(self, requests: int, warmup: int, load_seconds: float):
+        """
+        Выполняет сценарии и параллельную нагрузку на временной копии базы
+        данных. Каждый запрос фиксирует свою транзакцию, как на сервере,
+        поэтому в замер входят COMMIT и колбэки on_commit. Основная база
+        не меняется, копия удаляется после замера.
+        """
+        original = connections[DEFAULT_DB_ALIAS]
+        copy_settings = self.copy_database(original)
+        try:
+            with self.use_database(copy_settings):
+                results = {
+                    'endpoints': self.run_scenarios(requests, warmup)
+                }
+            if load_seconds:
+                results['load'] = self.run_load(copy_settings, load_seconds)
+            return results
+        finally:
+            self.drop_database(original, copy_settings)
+
+    def run_load(self, copy_settings: dict, seconds: float):
+        """
+        Пропускная способность базы при параллельном чтении отзывов
+        и изменении пользователей, в том числе число ошибок блокировки.
+        """
+        stats = concurrent_load(
+            copy_settings,
+            (f'SELECT COUNT(*), MAX(LENGTH(text)) '
+             f'FROM {Review._meta.db_table}', ()),
+            (f'UPDATE {User._meta.db_table} SET bio = %s '
+             f'WHERE username = %s', ('benchmark', 'bench_user')),
+            seconds,
+        )
+        load = {
+            'seconds': seconds,
+            'reads_per_s': round(stats['reads'] / seconds, 1),
+            'writes_per_s': round(stats['writes'] / seconds, 1),
+            'locked': stats['locked'],
+        }
+        self.stdout.write(
+            f'Concurrent load: {load["reads_per_s"]} reads/s, '
+            f'{load["writes_per_s"]} writes/s, '
+            f'{load["locked"]} "database is locked" errors'
+        )
+        return load
+
+    def copy_database(self, original):
+        """Копирует основную базу и возвращает настройки копии."""
+        if original.vendor != 'sqlite':
+            original.creation.clone_test_db(
+                COPY_SUFFIX, verbosity=0, autoclobber=True
+            )
+            return original.creation.get_test_db_clone_settings(COPY_SUFFIX)
+        descriptor, name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descriptor)
+        # Резервное копирование SQLite учитывает журнал WAL
+        # и работает и для базы в памяти.
+        original.ensure_connection()
+        target = sqlite3.connect(name)
+        try:
+            original.connection.backup(target)
+        finally:
+            target.close()
+        return {**original.settings_dict, 'NAME': name}
+
+    def drop_database(self, original, copy_settings: dict):
+        if original.vendor != 'sqlite':
+            original.creation.destroy_test_db(
+                original.settings_dict['NAME'], verbosity=0,
+                suffix=COPY_SUFFIX,
+            )
+            return
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{copy_settings["NAME"]}{suffix}').unlink(missing_ok=True)
+
+    @contextmanager
+    def use_database(self, copy_settings: dict):
+        """
+        Подменяет соединения с основной базой и репликами соединением
+        с копией: обработчик запросов и роутер работают как обычно.
+        """
+        aliases = [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]
+        originals = {alias: connections[alias] for alias in aliases}
+        copy = type(originals[DEFAULT_DB_ALIAS])(
+            copy_settings, DEFAULT_DB_ALIAS
+        )
+        for alias in aliases:
+            connections[alias] = copy
+        try:
+            yield
+        finally:
+            copy.close()
+            for alias, original in originals.items():
+                connections[alias] = original
+
+    def get_context(self):
+        title = Title.objects.order_by('-review_count', 'id').first()
+        review = title and title.reviews.order_by('-id').first()
+        if review is None:
+            raise CommandError(
+                'The benchmark needs titles with reviews, '
+                'fill the database with generate_data first'
+            )
+        roles = {
+            role: User.objects.create(
+                username=f'bench_{role}', email=f'bench_{role}@yamdb.fake',
+                role=role,
+            )
+            for role in ('user', 'moderator', 'admin')
+        }
+        comment = review.comments.order_by('-id').first()
+        if comment is None:
+            comment = Comment.objects.create(
+                review=review, author=roles['user'], text='Комментарий'
+            )
+        return {
+            'title': title,
+            'review': review,
+            'comment': comment,
+            'category': title.category or Category.objects.first(),
+            'genre': title.genre.first() or Genre.objects.first(),
+            'user': roles['user'],
+            'confirmation_code': default_token_generator.make_token(
+                roles['user']
+            ),
+            'tokens': {
+                role: str(AccessToken.for_user(user))
+                for role, user in roles.items()
+            },
+            'created': {},
+        }
+
+    def run_scenarios(self, requests: int, warmup: int):
+        context = self.get_context()
+        endpoints = {}
+        for scenario in SCENARIOS:
+            method, name, role, url_kwargs, params, data = scenario
+            label = scenario_label(scenario, context)
+            latencies = []
+            created = []
+            for i in range(warmup + requests):
+                url = reverse(name, kwargs=resolve(url_kwargs, context, i))
+                status, body, elapsed = self.call(
+                    method, url, context['tokens'].get(role),
+                    resolve(params, context, i), resolve(data, context, i)
+                )
+                if status >= 400:
+                    raise CommandError(
+                        f'{label} returned {status}: {body[:200]!r}'
+                    )
+                if method == 'post' and body:
+                    created.append(json.loads(body))
+                if i >= warmup:
+                    latencies.append(elapsed)
+            if method == 'post':
+                context['created'][name] = created
+            endpoints[label] = summarize(latencies)
+            self.report(label, endpoints[label])
+        return endpoints
+
+    def call(self, method: str, url: str, token, params, data):
+        """Вызывает WSGI-приложение и возвращает статус, тело и время."""
+        body = b'' if data is None else json.dumps(data).encode()
+        environ = {
+            'REQUEST_METHOD': method.upper(),
+            'PATH_INFO': url,
+            'QUERY_STRING': urlencode(params or {}, doseq=True),
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'testserver',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': BytesIO(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if token:
+            environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        response_status = []
+
+        def start_response(status, headers, exc_info=None):
+            response_status.append(int(status.split()[0]))
+
+        started = time.perf_counter()
+        response = application(environ, start_response)
+        try:
+            content = b''.join(response)
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - started
+        return response_status[0], content, elapsed
+
+    def report(self, label: str, stats: dict):
+        self.stdout.write(
+            f'{label}: {stats["rps"]} req/s, p50 {stats["p50_ms"]}ms, '
+            f'p95 {stats["p95_ms"]}ms, p99 {stats["p99_ms"]}ms'
+        )
+
+    def compare(self, baseline: dict, current: dict, metric: str,
+                threshold: float):
+        regressions = []
+        for label, stats in current.items():
+            if label not in baseline:
+                continue
+            before, after = baseline[label][metric], stats[metric]
+            change = (after - before) / before if before else 0
+            self.stdout.write(
+                f'{label}: {metric} {before} -> {after} ({change:+.0%})'
+            )
+            if change > threshold:
+                regressions.append(f'{label} ({change:+.0%})')
+        if regressions:
+            raise CommandError(
+                f'{metric} regressed by more than {threshold:.0%}: '
+                + ', '.join(regressions)
+            )
+        self.stdout.write('No regressions')
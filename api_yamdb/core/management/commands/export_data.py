@@ -0,0 +1,190 @@
+import csv
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+ENCODING = 'utf-8'
+
+CHUNK_SIZE = 2000
+
+FORMATS = ('csv', 'ndjson')
+
+# Таблица выгрузки: (модель, имя файла без расширения,
+# колонки в формате (заголовок, поле модели)).
+# Имена файлов и колонок совпадают с static/data/ и import_csv.
+TABLES = {
+    'category': (Category, 'category', (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'genre': (Genre, 'genre', (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'users': (User, 'users', (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'titles': (Title, 'titles', (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'),
+    )),
+    'genre_title': (Title.genre.through, 'genre_title', (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    'review': (Review, 'review', (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': (Comment, 'comments', (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    )),
+}
+
+
+def format_value(value):
+    """Приводит значение к виду, в котором оно хранится в static/data/."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).isoformat()
+        return value.replace('+00:00', 'Z')
+    return value
+
+
+class CsvWriter:
+
+    def __init__(self, file, header):
+        self.writer = csv.writer(file)
+        self.writer.writerow(header)
+
+    def write(self, values):
+        self.writer.writerow(values)
+
+
+class NdjsonWriter:
+
+    def __init__(self, file, header):
+        self.file = file
+        self.header = header
+
+    def write(self, values):
+        self.file.write(
+            json.dumps(dict(zip(self.header, values)), ensure_ascii=False)
+        )
+        self.file.write('\n')
+
+
+WRITERS = {'csv': CsvWriter, 'ndjson': NdjsonWriter}
+
+
+class Command(BaseCommand):
+    help = 'Exports all tables to csv or ndjson in the static/data/ layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default='export',
+            help='Directory the files are written to',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default='csv',
+            help='Output format',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Compress every file with gzip',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Number of rows fetched from the database at a time',
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Number of tables exported concurrently',
+        )
+        parser.add_argument(
+            '--tables',
+            nargs='+',
+            choices=TABLES,
+            default=list(TABLES),
+            help='Tables to export',
+        )
+
+    def handle(self, *args, **options):
+        self.output_dir = Path(options['output_dir'])
+        self.format = options['format']
+        self.gzip = options['gzip']
+        self.chunk_size = options['chunk_size']
+        if self.chunk_size < 1:
+            raise CommandError('--chunk-size must be a positive number')
+        if options['jobs'] < 1:
+            raise CommandError('--jobs must be a positive number')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if options['jobs'] == 1:
+            for name in options['tables']:
+                self.export_table(name)
+            return
+        with ThreadPoolExecutor(max_workers=options['jobs']) as executor:
+            for _ in executor.map(
+                self.export_table_in_thread, options['tables']
+            ):
+                pass
+
+    def get_file_path(self, file_name: str):
+        file_path = self.output_dir / f'{file_name}.{self.format}'
+        if self.gzip:
+            file_path = file_path.with_name(file_path.name + '.gz')
+        return file_path
+
+    def open_file(self, file_path: Path):
+        if self.gzip:
+            return gzip.open(file_path, 'wt', encoding=ENCODING, newline='')
+        return open(file_path, 'w', encoding=ENCODING, newline='')
+
+    def export_table_in_thread(self, name: str):
+        try:
+            self.export_table(name)
+        finally:
+            connections.close_all()
+
+    def export_table(self, name: str):
+        """
+        Выгружает таблицу построчно: iterator() читает строки из БД
+        пачками по chunk_size, не кешируя их в QuerySet.
+        """
+        model, file_name, columns = TABLES[name]
+        header = [column for column, _ in columns]
+        fields = [field for _, field in columns]
+        rows = (
+            model.objects.order_by('id').values_list(*fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        file_path = self.get_file_path(file_name)
+        started = time.monotonic()
+        count = 0
+        with self.open_file(file_path) as file:
+            writer = WRITERS[self.format](file, header)
+            for row in rows:
+                writer.write([format_value(value) for value in row])
+                count += 1
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{file_path.name}: {count} rows in {elapsed:.2f}s '
+            f'({count / elapsed:.0f} rows/s)'
+        )
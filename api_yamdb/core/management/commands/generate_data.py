@@ -0,0 +1,328 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from core.cache import invalidate_list
+from core.management.commands.export_data import (ENCODING, TABLES,
+                                                  CsvWriter, format_value)
+from reviews.models import Category, Genre, Title
+
+BATCH_SIZE = 5000
+
+ZIPF_EXPONENT = 1.1
+
+MAX_GENRES_PER_TITLE = 3
+
+FIRST_YEAR = 1900
+
+LAST_YEAR = 2020
+
+FIRST_PUB_DATE = datetime(2019, 1, 1, tzinfo=timezone.utc)
+
+PUB_DATE_PERIOD = int(timedelta(days=3 * 365).total_seconds())
+
+# Доли модераторов и администраторов среди пользователей.
+MODERATOR_SHARE = 0.01
+
+ADMIN_SHARE = 0.001
+
+# Веса оценок 1..10: пользователи чаще ставят высокие оценки.
+SCORE_WEIGHTS = (2, 1, 1, 2, 3, 5, 8, 11, 9, 7)
+
+WORDS = (
+    'фильм', 'книга', 'песня', 'сюжет', 'герой', 'финал', 'автор',
+    'режиссёр', 'актёр', 'музыка', 'история', 'жизнь', 'любовь', 'война',
+    'мир', 'время', 'город', 'дорога', 'тайна', 'мечта', 'свобода',
+    'отличный', 'скучный', 'живой', 'грустный', 'смешной', 'долгий',
+    'неожиданный', 'красивый', 'странный', 'честный', 'лучший', 'новый',
+    'понравился', 'удивил', 'запомнился', 'рекомендую', 'пересмотрю',
+    'прочитал', 'слушаю', 'очень', 'совсем', 'снова', 'почти', 'всегда',
+)
+
+# Таблицы в порядке, в котором их можно заполнять.
+ORDER = (
+    'category', 'genre', 'users', 'titles', 'genre_title', 'review',
+    'comments',
+)
+
+
+def zipf_weights(size: int, exponent: float):
+    """Веса 1 / rank ** exponent для рангов 1..size."""
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+def zipf_counts(total: int, size: int, exponent: float, capacity: int):
+    """
+    Распределяет total объектов по size корзинам пропорционально
+    весам Ципфа, не превышая capacity в одной корзине. Остаток от
+    округления и переполнение популярных корзин достаются следующим.
+    """
+    weights = zipf_weights(size, exponent)
+    weight_sum = sum(weights)
+    counts = [
+        min(capacity, int(total * weight / weight_sum)) for weight in weights
+    ]
+    left = total - sum(counts)
+    for index in range(size):
+        if not left:
+            break
+        extra = min(left, capacity - counts[index])
+        counts[index] += extra
+        left -= extra
+    return counts
+
+
+@contextmanager
+def keep_pub_dates(model):
+    """
+    Отключает auto_now_add у pub_date, чтобы bulk_create сохранил
+    сгенерированные даты, а не текущее время.
+    """
+    if not hasattr(model, 'pub_date'):
+        yield
+        return
+    field = model._meta.get_field('pub_date')
+    auto_now_add = field.auto_now_add
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generates a synthetic dataset of the given size'
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('categories', 10), ('genres', 30), ('users', 1000),
+            ('titles', 200), ('reviews', 5000), ('comments', 10000),
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Number of {name} to generate',
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, the same seed gives the same dataset',
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=ZIPF_EXPONENT,
+            help='Zipf exponent of title and genre popularity',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of rows written to the database per query',
+        )
+        parser.add_argument(
+            '--csv-dir',
+            help=(
+                'Write csv files in the static/data/ layout to this '
+                'directory instead of the database'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.sizes = {
+            'category': options['categories'],
+            'genre': options['genres'],
+            'users': options['users'],
+            'titles': options['titles'],
+            'review': options['reviews'],
+            'comments': options['comments'],
+        }
+        self.zipf = options['zipf']
+        self.batch_size = options['batch_size']
+        self.csv_dir = options['csv_dir'] and Path(options['csv_dir'])
+        self.check_options()
+        self.rng = random.Random(options['seed'])
+        if self.csv_dir:
+            self.csv_dir.mkdir(parents=True, exist_ok=True)
+            self.start_ids = {name: 1 for name in ORDER}
+            self.generate_all()
+            return
+        self.start_ids = {
+            name: (TABLES[name][0].objects.aggregate(Max('id'))['id__max']
+                   or 0) + 1
+            for name in ORDER
+        }
+        with transaction.atomic():
+            self.generate_all()
+            titles = Title.objects.filter(id__gte=self.start_ids['titles'])
+            titles.recalculate_rating()
+            titles.recalculate_trending()
+            invalidate_list(Category, Genre)
+
+    def check_options(self):
+        for name, size in self.sizes.items():
+            if size < 0:
+                raise CommandError(f'Number of {name} must not be negative')
+        if self.batch_size < 1:
+            raise CommandError('--batch-size must be a positive number')
+        if self.zipf <= 0:
+            raise CommandError('--zipf must be a positive number')
+        if self.sizes['review'] > self.sizes['titles'] * self.sizes['users']:
+            raise CommandError(
+                'Every user can review a title only once: '
+                '--reviews must not exceed --titles * --users'
+            )
+        if self.sizes['comments'] and not (
+            self.sizes['review'] and self.sizes['users']
+        ):
+            raise CommandError('Comments require reviews and users')
+
+    def generate_all(self):
+        for name in ORDER:
+            self.write_table(name, getattr(self, f'generate_{name}')())
+
+    def write_table(self, name: str, rows):
+        model, file_name, columns = TABLES[name]
+        started = time.monotonic()
+        if self.csv_dir:
+            count = self.write_csv(file_name, columns, rows)
+        else:
+            count = self.write_objects(model, columns, rows)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{model.__name__}: {count} rows in {elapsed:.2f}s '
+            f'({count / elapsed:.0f} rows/s)'
+        )
+
+    def write_csv(self, file_name: str, columns, rows):
+        count = 0
+        file_path = self.csv_dir / f'{file_name}.csv'
+        with open(file_path, 'w', encoding=ENCODING, newline='') as file:
+            writer = CsvWriter(file, [column for column, _ in columns])
+            for row in rows:
+                writer.write([format_value(value) for value in row])
+                count += 1
+        return count
+
+    def write_objects(self, model, columns, rows):
+        count = 0
+        fields = [field for _, field in columns]
+        with keep_pub_dates(model):
+            while True:
+                batch = [
+                    model(**dict(zip(fields, row)))
+                    for row in islice(rows, self.batch_size)
+                ]
+                if not batch:
+                    return count
+                model.objects.bulk_create(batch)
+                count += len(batch)
+
+    def text(self, min_words: int, max_words: int):
+        words = self.rng.choices(
+            WORDS, k=self.rng.randint(min_words, max_words)
+        )
+        return ' '.join(words).capitalize()
+
+    def pub_date(self):
+        return FIRST_PUB_DATE + timedelta(
+            seconds=self.rng.randrange(PUB_DATE_PERIOD)
+        )
+
+    def generate_category(self):
+        start = self.start_ids['category']
+        for pk in range(start, start + self.sizes['category']):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def generate_genre(self):
+        start = self.start_ids['genre']
+        for pk in range(start, start + self.sizes['genre']):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def generate_users(self):
+        start = self.start_ids['users']
+        for pk in range(start, start + self.sizes['users']):
+            share = self.rng.random()
+            if share < ADMIN_SHARE:
+                role = 'admin'
+            elif share < ADMIN_SHARE + MODERATOR_SHARE:
+                role = 'moderator'
+            else:
+                role = 'user'
+            yield (pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', '')
+
+    def generate_titles(self):
+        start = self.start_ids['titles']
+        categories = self.sizes['category']
+        for pk in range(start, start + self.sizes['titles']):
+            category = None
+            if categories:
+                category = (self.start_ids['category']
+                            + self.rng.randrange(categories))
+            yield (
+                pk, self.text(1, 4), self.rng.randint(FIRST_YEAR, LAST_YEAR),
+                category,
+            )
+
+    def generate_genre_title(self):
+        """Жанры произведениям выбираются по Ципфу: популярных жанров мало."""
+        genres = self.sizes['genre']
+        if not genres:
+            return
+        cum_weights = list(accumulate(zipf_weights(genres, self.zipf)))
+        pk = self.start_ids['genre_title']
+        for title in range(self.sizes['titles']):
+            picked = set(self.rng.choices(
+                range(genres), cum_weights=cum_weights,
+                k=self.rng.randint(1, MAX_GENRES_PER_TITLE)
+            ))
+            for genre in sorted(picked):
+                yield (pk, self.start_ids['titles'] + title,
+                       self.start_ids['genre'] + genre)
+                pk += 1
+
+    def generate_review(self):
+        """
+        Число отзывов на произведение распределено по Ципфу, а ранги
+        популярности случайно перемешаны между произведениями. Авторы
+        отзывов на одно произведение не повторяются.
+        """
+        titles, users = self.sizes['titles'], self.sizes['users']
+        if not self.sizes['review']:
+            return
+        counts = zipf_counts(self.sizes['review'], titles, self.zipf, users)
+        ranks = list(range(titles))
+        self.rng.shuffle(ranks)
+        pk = self.start_ids['review']
+        for title, rank in enumerate(ranks):
+            for author in self.rng.sample(range(users), counts[rank]):
+                yield (
+                    pk, self.start_ids['titles'] + title, self.text(5, 40),
+                    self.start_ids['users'] + author,
+                    self.rng.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                    self.pub_date(),
+                )
+                pk += 1
+
+    def generate_comments(self):
+        start = self.start_ids['comments']
+        for pk in range(start, start + self.sizes['comments']):
+            yield (
+                pk,
+                self.start_ids['review']
+                + self.rng.randrange(self.sizes['review']),
+                self.text(3, 20),
+                self.start_ids['users'] + self.rng.randrange(
+                    self.sizes['users']
+                ),
+                self.pub_date(),
+            )
@@ -1,10 +1,22 @@
 import csv
+import hashlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
 
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.management.base import BaseCommand
-from django.db.models import Model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Model, Q
+from django.utils import timezone
 
 from api_yamdb.settings import STATICFILES_DIRS
+from core.cache import invalidate_list
+from core.management.commands.generate_data import keep_pub_dates
+from core.models import ImportCheckpoint, ImportedFile, ImportedRow
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
@@ -12,33 +24,599 @@ DATA_DIR = STATICFILES_DIRS[0] / 'data/'
 
 ENCODING = 'utf-8'
 
+BATCH_SIZE = 1000
+
+PROGRESS_INTERVAL = 1
+
+# Этап импорта: (метод, файл, этапы, от которых он зависит).
+# Этапы перечислены в порядке, допустимом для последовательного импорта.
+STAGES = {
+    'category': ('import_categories', 'category.csv', ()),
+    'genre': ('import_genres', 'genre.csv', ()),
+    'users': ('import_users', 'users.csv', ()),
+    'titles': ('import_titles', 'titles.csv', ('category',)),
+    'genre_title': (
+        'import_title_genres', 'genre_title.csv', ('titles', 'genre')
+    ),
+    'review': ('import_reviews', 'review.csv', ('titles', 'users')),
+    'comments': ('import_comments', 'comments.csv', ('review', 'users')),
+}
+
+
+class TrackedLines:
+    """
+    Итератор строк бинарного файла, запоминающий позицию в байтах
+    после последней отданной строки. csv.reader забирает строки
+    по одной, поэтому после каждой записи позиция указывает на её конец.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.position = file.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self.position += len(line)
+        return line.decode(ENCODING)
+
+    def seek(self, position):
+        self.file.seek(position)
+        self.position = position
+
 
 class Command(BaseCommand):
     help = 'Imports csv'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            help='Directory with csv files, static/data/ by default',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of csv rows written to the database per query',
+        )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help=(
+                'Commit every batch separately and look up ids per batch '
+                'so memory does not grow with file size'
+            ),
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue a --stream import from the last committed batch',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Skip unchanged files and apply only inserted, changed and '
+                'deleted rows since the last incremental import'
+            ),
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help=(
+                'Number of import stages run concurrently, each in its own '
+                'thread, database connection and transaction'
+            ),
+        )
+
     def handle(self, *args, **options):
-        self.import_categories('category.csv')
-        self.import_genres('genre.csv')
-        self.import_users('users.csv')
-        self.import_titles('titles.csv')
-        self.import_title_genres('genre_title.csv')
-        self.import_reviews('review.csv')
-        self.import_comments('comments.csv')
+        self.data_dir = Path(options['data_dir'] or DATA_DIR)
+        self.batch_size = options['batch_size']
+        self.stream = options['stream']
+        self.resume = options['resume']
+        self.jobs = options['jobs']
+        self.incremental = options['incremental']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size must be a positive number')
+        if self.jobs < 1:
+            raise CommandError('--jobs must be a positive number')
+        # SQLite допускает только одну пишущую транзакцию: транзакция
+        # всего этапа не дала бы писать остальным этапам. Поэтому
+        # параллельные этапы фиксируют каждую пачку отдельно и пишут
+        # по очереди под блокировкой, а читают и разбирают csv
+        # одновременно.
+        self.write_lock = None
+        if self.jobs > 1 and connection.vendor == 'sqlite':
+            self.write_lock = threading.Lock()
+            if not self.stream:
+                self.stream = True
+                self.stdout.write('SQLite: --jobs implies --stream')
+        if self.resume and not self.stream:
+            raise CommandError('--resume can only be used with --stream')
+        self.ids = {}
+        self.ids_lock = threading.Lock()
+        self.modified = False
+        if self.stream:
+            if not self.resume:
+                ImportCheckpoint.objects.all().delete()
+            self.import_all()
+            ImportCheckpoint.objects.all().delete()
+        elif self.jobs > 1:
+            self.import_all()
+        else:
+            with transaction.atomic():
+                self.import_all()
+
+    def import_all(self):
+        started = time.monotonic()
+        if self.jobs > 1:
+            timings = self.run_stages_concurrently()
+        else:
+            timings = {name: self.run_stage(name) for name in STAGES}
+        # bulk_create и bulk_update не отправляют сигналы,
+        # поэтому рейтинг и популярность произведений пересчитываются
+        # в конце.
+        if self.modified:
+            Title.objects.recalculate_rating()
+            Title.objects.all().recalculate_trending()
+            invalidate_list(Category, Genre)
+        self.report_timings(timings, time.monotonic() - started)
+
+    def run_stage(self, name: str):
+        """Выполняет этап импорта и возвращает его длительность."""
+        method, file_name, _ = STAGES[name]
+        started = time.monotonic()
+        if self.jobs > 1 and not self.stream:
+            with transaction.atomic():
+                getattr(self, method)(file_name)
+        else:
+            getattr(self, method)(file_name)
+        return time.monotonic() - started
+
+    def lock_writes(self):
+        """Блокировка записи пачки при параллельном импорте в SQLite."""
+        return self.write_lock or nullcontext()
+
+    def run_stage_in_thread(self, name: str):
+        try:
+            return self.run_stage(name)
+        finally:
+            # У каждого потока своё соединение с БД, закрываем его сами.
+            connections.close_all()
+
+    def run_stages_concurrently(self):
+        """
+        Запускает этапы в пуле из jobs потоков: этап стартует,
+        как только завершены все этапы, от которых он зависит.
+        """
+        timings = {}
+        pending = dict(STAGES)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                for name, (_, _, dependencies) in list(pending.items()):
+                    if all(stage in timings for stage in dependencies):
+                        future = executor.submit(
+                            self.run_stage_in_thread, name
+                        )
+                        running[future] = name
+                        del pending[name]
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    timings[running.pop(future)] = future.result()
+        return timings
+
+    def report_timings(self, timings: dict, total: float):
+        """Выводит длительность этапов и критический путь."""
+        finish = {}
+        previous = {}
+        for name, (_, _, dependencies) in STAGES.items():
+            previous[name] = max(
+                dependencies, key=lambda stage: finish[stage], default=None
+            )
+            start = finish[previous[name]] if previous[name] else 0
+            finish[name] = start + timings[name]
+        for name in STAGES:
+            self.stdout.write(f'Stage {name}: {timings[name]:.2f}s')
+        stage = max(finish, key=finish.get)
+        path = []
+        while stage:
+            path.append(stage)
+            stage = previous[stage]
+        self.stdout.write(
+            f'Critical path: {" -> ".join(reversed(path))} '
+            f'({finish[path[0]]:.2f}s), wall-clock {total:.2f}s'
+        )
 
     def get_file_path(self, file_name: str):
-        return DATA_DIR / file_name
+        return self.data_dir / file_name
 
-    def import_dictionary(self, model: Model, file_name: str):
+    def get_ids(self, model: Model):
+        """Множество id, уже сохранённых в таблице модели."""
+        with self.ids_lock:
+            if model not in self.ids:
+                self.ids[model] = set(
+                    model.objects.values_list('id', flat=True)
+                )
+            return self.ids[model]
+
+    def existing_ids(self, model: Model, ids):
+        """
+        Возвращает те id из ids, которые есть в таблице модели.
+        В потоковом режиме id проверяются запросом на каждую пачку,
+        иначе - по множеству, загруженному один раз на таблицу.
+        """
+        if self.stream:
+            return set(
+                model.objects.filter(id__in=set(ids))
+                .values_list('id', flat=True)
+            )
+        known = self.get_ids(model)
+        return {pk for pk in ids if pk in known}
+
+    def get_checkpoint(self, file_name: str, file_size: int):
+        if not self.resume:
+            return None
+        checkpoint = ImportCheckpoint.objects.filter(
+            file_name=file_name
+        ).first()
+        if checkpoint and checkpoint.file_size != file_size:
+            raise CommandError(
+                f'{file_name} changed since the last import, '
+                'run it again without --resume'
+            )
+        return checkpoint
+
+    def save_checkpoint(self, file_name: str, file_size: int, offset: int,
+                        rows: int):
+        if self.stream:
+            ImportCheckpoint.objects.update_or_create(
+                file_name=file_name,
+                defaults={
+                    'file_size': file_size, 'offset': offset, 'rows': rows
+                },
+            )
+
+    def file_fingerprint(self, file_path):
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def row_hash(self, row: dict):
+        values = '\x1f'.join(value or '' for value in row.values())
+        return hashlib.sha1(values.encode(ENCODING)).hexdigest()
+
+    def get_row_hashes(self, file_name: str):
+        """Хеши строк файла, сохранённые прошлым инкрементальным импортом."""
+        return dict(
+            ImportedRow.objects.filter(file_name=file_name)
+            .values_list('key', 'row_hash').iterator()
+        )
+
+    def save_row_hashes(self, file_name: str, hashes: dict):
+        ImportedRow.objects.filter(
+            file_name=file_name, key__in=list(hashes)
+        ).delete()
+        ImportedRow.objects.bulk_create(
+            (
+                ImportedRow(file_name=file_name, key=key, row_hash=row_hash)
+                for key, row_hash in hashes.items()
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def delete_missing_rows(self, file_name: str, keys: list, delete_rows):
+        """Удаляет строки, которых больше нет в файле."""
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            with self.lock_writes(), transaction.atomic():
+                delete_rows(batch)
+                ImportedRow.objects.filter(
+                    file_name=file_name, key__in=batch
+                ).delete()
+        if keys:
+            self.modified = True
+        self.stdout.write(f'{file_name}: {len(keys)} deleted')
+
+    def read_batches(self, file_path, offset: int = 0):
+        """
+        Читает csv-файл пачками по batch_size строк, начиная с offset.
+        Вместе с пачкой возвращает позицию её конца в файле.
+        """
+        with open(file_path, 'rb') as file:
+            lines = TrackedLines(file)
+            header = next(csv.reader(lines))
+            if offset:
+                lines.seek(offset)
+            reader = csv.DictReader(lines, fieldnames=header)
+            while True:
+                rows = list(islice(reader, self.batch_size))
+                if not rows:
+                    return
+                yield rows, lines.position
+
+    def diff_rows(self, file_name: str, file_path, row_key,
+                  existing_keys):
+        """
+        Сравнивает хеши строк файла с сохранёнными прошлым импортом.
+        Возвращает хеши новых и изменённых строк по их ключам
+        и ключи строк, которых больше нет в файле. Неизменившаяся
+        строка тоже считается изменённой, если её нет в таблице:
+        её удалило каскадное удаление записи из другого файла.
+        """
+        stored = self.get_row_hashes(file_name)
+        changed = {}
+        for rows, _ in self.read_batches(file_path):
+            unchanged = {}
+            for row in rows:
+                key = row_key(row)
+                row_hash = self.row_hash(row)
+                if stored.pop(key, None) != row_hash:
+                    changed[key] = row_hash
+                else:
+                    unchanged[key] = row_hash
+            if unchanged:
+                found = existing_keys(list(unchanged))
+                changed.update({
+                    key: row_hash for key, row_hash in unchanged.items()
+                    if key not in found
+                })
+        return changed, list(stored)
+
+    def save_rows(self, file_name: str, rows: list, hashes: dict,
+                  save_batch):
+        """Сохраняет пачку строк и возвращает число пропущенных."""
+        if not rows:
+            return 0
+        skipped = save_batch(rows) or set()
+        self.modified = True
+        if self.incremental:
+            self.save_row_hashes(file_name, {
+                key: row_hash for key, row_hash in hashes.items()
+                if key not in skipped
+            })
+        return len(skipped)
+
+    def save_fingerprint(self, file_name: str, fingerprint: str,
+                         skipped: int, written: bool):
+        """
+        Запоминает отпечаток файла, только если все его строки
+        сохранены: иначе следующий импорт пропустил бы файл и не
+        повторил пропущенные строки. Если строки файла добавлены или
+        удалены, отпечатки зависимых файлов сбрасываются: их строки
+        могли быть пропущены без родительской записи или удалены
+        каскадно вместе с ней.
+        """
+        if skipped:
+            ImportedFile.objects.filter(file_name=file_name).delete()
+            self.stdout.write(
+                f'{file_name}: {skipped} rows skipped, '
+                'they will be retried by the next import'
+            )
+        else:
+            ImportedFile.objects.update_or_create(
+                file_name=file_name, defaults={'fingerprint': fingerprint}
+            )
+        if written:
+            ImportedFile.objects.filter(
+                file_name__in=self.dependent_files(file_name)
+            ).delete()
+
+    def dependent_files(self, file_name: str):
+        """Файлы этапов, прямо или косвенно зависящих от этапа файла."""
+        stages = {
+            name for name, (_, stage_file, _) in STAGES.items()
+            if stage_file == file_name
+        }
+        for name, (_, _, dependencies) in STAGES.items():
+            if stages.intersection(dependencies):
+                stages.add(name)
+        return [
+            stage_file for name, (_, stage_file, _) in STAGES.items()
+            if name in stages and stage_file != file_name
+        ]
+
+    def process_file(self, file_name: str, save_batch, row_key=None,
+                     delete_rows=None, existing_keys=None):
+        """
+        Читает csv-файл пачками и передаёт каждую пачку в save_batch.
+        Контрольная точка сохраняется в той же транзакции,
+        что и данные пачки.
+
+        В инкрементальном режиме неизменившийся файл пропускается.
+        Иначе файл сначала сравнивается с хешами строк прошлого импорта:
+        пропавшие из файла строки удаляются через delete_rows, а в
+        save_batch передаются только новые и изменённые строки (по ключу
+        row_key). save_batch возвращает ключи строк, которые не удалось
+        сохранить: они будут обработаны при следующем импорте.
+        existing_keys возвращает те из переданных ключей, строки
+        которых есть в таблице.
+        """
         file_path = self.get_file_path(file_name)
-        with open(file_path, encoding=ENCODING) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    model.objects.update_or_create(id=row['id'], defaults=row)
-                except Exception as e:
-                    self.stdout.write(
-                        f'Error importing into {model.__name__}: {e}'
-                    )
+        file_size = file_path.stat().st_size
+        if self.incremental:
+            fingerprint = self.file_fingerprint(file_path)
+            if ImportedFile.objects.filter(
+                file_name=file_name, fingerprint=fingerprint
+            ).exists():
+                self.stdout.write(f'{file_name}: unchanged, skipped')
+                return
+            changed, deleted = self.diff_rows(
+                file_name, file_path, row_key, existing_keys
+            )
+            # Удаление идёт первым, чтобы освободить уникальные значения
+            # для строк, которые в файле получили новый id.
+            self.delete_missing_rows(file_name, deleted, delete_rows)
+            # Хеши строк сохраняются вместе с пачкой, поэтому после сбоя
+            # файл читается заново, а уже загруженные строки пропускаются.
+            checkpoint = None
+        else:
+            checkpoint = self.get_checkpoint(file_name, file_size)
+        progress = self.start_progress(file_name, file_size, checkpoint)
+        skipped = written = 0
+        batches = ()
+        if not self.incremental or changed:
+            batches = self.read_batches(
+                file_path, checkpoint.offset if checkpoint else 0
+            )
+        for rows, position in batches:
+            progress['rows'] += len(rows)
+            hashes = {}
+            if self.incremental:
+                rows = [row for row in rows if row_key(row) in changed]
+                hashes = {row_key(row): changed[row_key(row)] for row in rows}
+            with self.lock_writes(), transaction.atomic():
+                batch_skipped = self.save_rows(
+                    file_name, rows, hashes, save_batch
+                )
+                self.save_checkpoint(
+                    file_name, file_size, position, progress['rows']
+                )
+            skipped += batch_skipped
+            written += len(rows) - batch_skipped
+            self.report_progress(progress, position)
+        self.report_progress(progress, file_size, final=True)
+        if self.incremental:
+            self.save_fingerprint(
+                file_name, fingerprint, skipped, bool(written or deleted)
+            )
+
+    def start_progress(self, file_name: str, file_size: int,
+                       checkpoint: ImportCheckpoint = None):
+        now = time.monotonic()
+        rows = checkpoint.rows if checkpoint else 0
+        return {
+            'file_name': file_name,
+            'file_size': file_size,
+            'rows': rows,
+            'start_rows': rows,
+            'start_offset': checkpoint.offset if checkpoint else 0,
+            'started': now,
+            'reported': now,
+        }
+
+    def report_progress(self, progress: dict, position: int,
+                        final: bool = False):
+        """Выводит скорость импорта и оценку оставшегося времени."""
+        now = time.monotonic()
+        if not final and now - progress['reported'] < PROGRESS_INTERVAL:
+            return
+        progress['reported'] = now
+        elapsed = max(now - progress['started'], 1e-6)
+        rows = progress['rows']
+        rows_rate = (rows - progress['start_rows']) / elapsed
+        bytes_rate = (position - progress['start_offset']) / elapsed
+        if final:
+            eta = 'done'
+        elif bytes_rate:
+            eta = str(timedelta(
+                seconds=round((progress['file_size'] - position) / bytes_rate)
+            ))
+        else:
+            eta = 'unknown'
+        percent = 100 * position / (progress['file_size'] or 1)
+        self.stdout.write(
+            f'{progress["file_name"]}: {rows} rows, '
+            f'{rows_rate:.0f} rows/s, {percent:.1f}%, ETA {eta}'
+        )
+
+    def save_objects(self, model: Model, objects: list, fields: list):
+        """
+        Вставляет новые объекты через bulk_create и обновляет
+        уже существующие через bulk_update. Дата публикации берётся
+        из файла, а не из времени импорта. bulk_update не заполняет
+        auto_now, поэтому updated_at выставляется здесь.
+        """
+        existing_ids = self.existing_ids(model, [obj.id for obj in objects])
+        new = [obj for obj in objects if obj.id not in existing_ids]
+        existing = [obj for obj in objects if obj.id in existing_ids]
+        if 'updated_at' in fields:
+            now = timezone.now()
+            for obj in existing:
+                obj.updated_at = now
+        try:
+            with keep_pub_dates(model):
+                model.objects.bulk_create(new, batch_size=self.batch_size)
+            model.objects.bulk_update(
+                existing, fields, batch_size=self.batch_size
+            )
+        except DatabaseError as e:
+            raise CommandError(f'Error importing into {model.__name__}: {e}')
+        if not self.stream:
+            self.get_ids(model).update(obj.id for obj in new)
+        return len(new), len(existing)
+
+    def drop_missing_references(self, objects: list, references: dict):
+        """
+        Отбрасывает объекты, ссылающиеся на несуществующие записи.
+        references сопоставляет имя атрибута с моделью, на которую он
+        ссылается. Пустая ссылка (None) допустима.
+        """
+        for attname, model in references.items():
+            found = self.existing_ids(
+                model, [getattr(obj, attname) for obj in objects]
+            )
+            objects = [
+                obj for obj in objects
+                if getattr(obj, attname) is None
+                or getattr(obj, attname) in found
+            ]
+        return objects
+
+    def import_rows(self, model: Model, file_name: str, make_object,
+                    fields: list = None, references: dict = None):
+        """Импортирует строки файла в таблицу модели."""
+        counts = {'created': 0, 'updated': 0, 'skipped': 0}
+
+        def save_batch(rows):
+            update_fields = fields or [key for key in rows[0] if key != 'id']
+            objects = list({
+                obj.id: obj for obj in map(make_object, rows)
+            }.values())
+            valid = self.drop_missing_references(objects, references or {})
+            new, existing = self.save_objects(model, valid, update_fields)
+            counts['created'] += new
+            counts['updated'] += existing
+            counts['skipped'] += len(rows) - len(valid)
+            return (
+                {str(obj.id) for obj in objects}
+                - {str(obj.id) for obj in valid}
+            )
+
+        def delete_rows(keys):
+            ids = [int(key) for key in keys]
+            model.objects.filter(id__in=ids).delete()
+            if not self.stream:
+                self.get_ids(model).difference_update(ids)
+
+        def existing_keys(keys):
+            return {
+                str(pk) for pk in
+                self.existing_ids(model, [int(key) for key in keys])
+            }
+
+        self.process_file(
+            file_name, save_batch, lambda row: str(int(row['id'])),
+            delete_rows, existing_keys
+        )
+        self.stdout.write(
+            f'{model.__name__}: {counts["created"]} created, '
+            f'{counts["updated"]} updated, {counts["skipped"]} skipped'
+        )
+
+    def import_dictionary(self, model: Model, file_name: str):
+        def make_object(row):
+            row['id'] = int(row['id'])
+            return model(**row)
+
+        self.import_rows(model, file_name, make_object)
 
     def import_categories(self, file_name: str):
         self.import_dictionary(Category, file_name)
@@ -50,73 +628,99 @@ class Command(BaseCommand):
         self.import_dictionary(User, file_name)
 
     def import_titles(self, file_name: str):
-        file_path = self.get_file_path(file_name)
-        with open(file_path, encoding=ENCODING) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    category = Category.objects.get(id=row['category'])
-                except ObjectDoesNotExist:
-                    continue
-
-                row['category'] = category
+        def make_object(row):
+            return Title(
+                id=int(row['id']),
+                name=row['name'],
+                year=row['year'],
+                # После удаления категории её ячейка выгружается пустой.
+                category_id=int(row['category']) if row['category'] else None,
+            )
 
-                try:
-                    Title.objects.update_or_create(id=row['id'], defaults=row)
-                except Exception as e:
-                    self.stdout.write(f"Error importing into Title: {e}")
+        self.import_rows(
+            Title, file_name, make_object,
+            ['name', 'year', 'category', 'updated_at'],
+            {'category_id': Category}
+        )
 
     def import_title_genres(self, file_name: str):
-        file_path = self.get_file_path(file_name)
-        with open(file_path, encoding=ENCODING) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    title = Title.objects.get(id=row['title_id'])
-                    genre = Genre.objects.get(id=row['genre_id'])
-                except ObjectDoesNotExist:
-                    continue
+        title_genre = Title.genre.through
+        counts = {'linked': 0, 'skipped': 0}
+
+        def link_key(link):
+            return f'{link.title_id}:{link.genre_id}'
+
+        def save_batch(rows):
+            links = [
+                title_genre(
+                    title_id=int(row['title_id']),
+                    genre_id=int(row['genre_id'])
+                )
+                for row in rows
+            ]
+            valid = self.drop_missing_references(
+                links, {'title_id': Title, 'genre_id': Genre}
+            )
+            title_genre.objects.bulk_create(
+                valid, batch_size=self.batch_size, ignore_conflicts=True
+            )
+            counts['linked'] += len(valid)
+            counts['skipped'] += len(rows) - len(valid)
+            return set(map(link_key, links)) - set(map(link_key, valid))
 
-                title.genre.add(genre)
+        def row_key(row):
+            return f'{int(row["title_id"])}:{int(row["genre_id"])}'
+
+        def delete_rows(keys):
+            pairs = Q()
+            for key in keys:
+                title_id, genre_id = key.split(':')
+                pairs |= Q(title_id=title_id, genre_id=genre_id)
+            title_genre.objects.filter(pairs).delete()
+
+        def existing_keys(keys):
+            links = title_genre.objects.filter(
+                title_id__in={key.split(':')[0] for key in keys}
+            )
+            return set(keys) & set(map(link_key, links))
+
+        self.process_file(
+            file_name, save_batch, row_key, delete_rows, existing_keys
+        )
+        self.stdout.write(
+            f'{title_genre.__name__}: {counts["linked"]} linked, '
+            f'{counts["skipped"]} skipped'
+        )
 
     def import_reviews(self, file_name: str):
-        file_path = self.get_file_path(file_name)
-        with open(file_path, encoding=ENCODING) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    title = Title.objects.get(id=row['title_id'])
-                    author = User.objects.get(id=row['author'])
-                except ObjectDoesNotExist:
-                    continue
-
-                row.pop('title_id')
-                row['title'] = title
-                row['author'] = author
-
-                try:
-                    Review.objects.update_or_create(id=row['id'], defaults=row)
-                except Exception as e:
-                    self.stdout.write(f"Error importing into Review: {e}")
+        def make_object(row):
+            return Review(
+                id=int(row['id']),
+                title_id=int(row['title_id']),
+                author_id=int(row['author']),
+                text=row['text'],
+                score=row['score'],
+                pub_date=row['pub_date'],
+            )
+
+        self.import_rows(
+            Review, file_name, make_object,
+            ['title', 'author', 'text', 'score', 'pub_date', 'updated_at'],
+            {'title_id': Title, 'author_id': User}
+        )
 
     def import_comments(self, file_name: str):
-        file_path = self.get_file_path(file_name)
-        with open(file_path, encoding=ENCODING) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    review = Review.objects.get(id=row['review_id'])
-                    author = User.objects.get(id=row['author'])
-                except ObjectDoesNotExist:
-                    continue
-
-                row.pop('review_id')
-                row['review'] = review
-                row['author'] = author
-
-                try:
-                    Comment.objects.update_or_create(
-                        id=row['id'], defaults=row
-                    )
-                except Exception as e:
-                    self.stdout.write(f"Error importing into Comment: {e}")
+        def make_object(row):
+            return Comment(
+                id=int(row['id']),
+                review_id=int(row['review_id']),
+                author_id=int(row['author']),
+                text=row['text'],
+                pub_date=row['pub_date'],
+            )
+
+        self.import_rows(
+            Comment, file_name, make_object,
+            ['review', 'author', 'text', 'pub_date', 'updated_at'],
+            {'review_id': Review, 'author_id': User}
+        )
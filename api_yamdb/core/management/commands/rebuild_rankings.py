@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds top-rated and trending title rankings from reviews'
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all()
+        titles.recalculate_rating()
+        count = titles.recalculate_trending()
+        self.stdout.write(f'Rankings rebuilt for {count} titles')
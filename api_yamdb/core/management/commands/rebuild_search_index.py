@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from reviews.search import INDEXES, create_sql, drop_sql, fill_sql
+
+
+class Command(BaseCommand):
+    help = (
+        'Recreates full-text search indexes and their triggers, '
+        'then indexes all existing rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'indexes', nargs='*',
+            help=f'Indexes to rebuild: {", ".join(INDEXES)} (default: all)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Full-text search indexes require SQLite')
+        unknown = set(options['indexes']) - set(INDEXES)
+        if unknown:
+            raise CommandError(
+                f'Unknown indexes: {", ".join(sorted(unknown))}'
+            )
+        for name in options['indexes'] or INDEXES:
+            index = INDEXES[name]
+            with transaction.atomic(), connection.cursor() as cursor:
+                for statement in drop_sql(index) + create_sql(index):
+                    cursor.execute(statement)
+                cursor.execute(fill_sql(index))
+                self.stdout.write(f'{name}: {cursor.rowcount} rows indexed')
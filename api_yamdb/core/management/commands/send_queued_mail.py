@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.mail import BATCH_SIZE, MAX_ATTEMPTS, deliver_queued_mail
+
+POLL_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends emails from the outgoing mail queue; several workers can '
+        'run at once, each claims its batch before sending'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of emails sent over one connection',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Number of attempts after which an email is given up',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=POLL_INTERVAL,
+            help='Seconds to wait between polls of an empty queue',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive number')
+        if options['max_attempts'] < 1:
+            raise CommandError('--max-attempts must be a positive number')
+        while True:
+            sent, failed = self.drain(
+                options['batch_size'], options['max_attempts']
+            )
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size: int, max_attempts: int):
+        """Отправляет пачки, пока в очереди есть письма, готовые к отправке."""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_queued_mail(batch_size, max_attempts)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                return total_sent, total_failed
@@ -0,0 +1,62 @@
+import hashlib
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .routers import read_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PIN_COOKIE = 'primary_pinned'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Направляет чтение безопасных запросов в случайную реплику, одну
+    на весь запрос.
+
+    После запроса, изменяющего данные, клиент на
+    settings.REPLICA_PIN_SECONDS секунд закрепляется за основной базой,
+    чтобы сразу видеть свои изменения, пока они доходят до реплик.
+    Клиент узнаётся по cookie и по токену из заголовка Authorization:
+    API-клиенты часто не хранят cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        pin_key = self.get_pin_key(request)
+        replica = None
+        if (request.method in SAFE_METHODS
+                and not self.is_pinned(request, pin_key)):
+            replica = random.choice(settings.DATABASE_REPLICAS)
+        token = read_replica.set(replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        if request.method not in SAFE_METHODS:
+            self.pin(response, pin_key)
+        return response
+
+    def get_pin_key(self, request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        digest = hashlib.sha1(authorization.encode()).hexdigest()
+        return f'primary-pin:{digest}'
+
+    def is_pinned(self, request, pin_key):
+        return PIN_COOKIE in request.COOKIES or (
+            pin_key is not None and cache.get(pin_key) is not None
+        )
+
+    def pin(self, response, pin_key):
+        seconds = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True)
+        if pin_key is not None:
+            cache.set(pin_key, True, seconds)
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-17 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed_by',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Обработчик'),
+        ),
+    ]
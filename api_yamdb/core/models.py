@@ -0,0 +1,127 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ImportCheckpoint(models.Model):
+    """Позиция последней сохранённой пачки потокового импорта csv."""
+    file_name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Файл',
+    )
+    file_size = models.BigIntegerField(verbose_name='Размер файла')
+    offset = models.BigIntegerField(
+        default=0,
+        verbose_name='Позиция в файле',
+    )
+    rows = models.BigIntegerField(
+        default=0,
+        verbose_name='Обработано строк',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления',
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    def __str__(self):
+        return f'{self.file_name}: {self.offset}/{self.file_size}'
+
+
+class ImportedFile(models.Model):
+    """Отпечаток csv-файла, загруженного инкрементальным импортом."""
+    file_name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Файл',
+    )
+    fingerprint = models.CharField(
+        max_length=64,
+        verbose_name='Хеш содержимого',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата обновления',
+    )
+
+    class Meta:
+        verbose_name = 'Импортированный файл'
+        verbose_name_plural = 'Импортированные файлы'
+
+    def __str__(self):
+        return self.file_name
+
+
+class ImportedRow(models.Model):
+    """Хеш содержимого строки csv-файла на момент последнего импорта."""
+    file_name = models.CharField(max_length=255, verbose_name='Файл')
+    key = models.CharField(max_length=255, verbose_name='Ключ строки')
+    row_hash = models.CharField(max_length=40, verbose_name='Хеш строки')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['file_name', 'key'],
+                name='unique_imported_row'
+            )
+        ]
+        verbose_name = 'Импортированная строка'
+        verbose_name_plural = 'Импортированные строки'
+
+    def __str__(self):
+        return f'{self.file_name}: {self.key}'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди исходящей почты."""
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipients = models.TextField(
+        verbose_name='Получатели',
+        help_text='Адреса получателей, по одному на строке',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки',
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка',
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата отправки',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    # Метка обработчика, который последним забрал письмо на отправку.
+    claimed_by = models.CharField(
+        max_length=32,
+        blank=True,
+        editable=False,
+        verbose_name='Обработчик',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'next_attempt_at'],
+                name='outgoing_email_pending_idx',
+            ),
+        ]
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.subject}: {self.recipients}'
@@ -0,0 +1,26 @@
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS
+
+# Реплика, из которой читает текущий запрос. Её выбирает
+# ReplicaRoutingMiddleware один раз на запрос, чтобы все его запросы
+# к базе видели одни и те же данные; вне запросов всё идёт в основную
+# базу.
+read_replica = ContextVar('read_replica', default=None)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение в реплику, выбранную для текущего запроса.
+    Запись всегда идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
@@ -34,6 +34,12 @@ class TitleAdmin(admin.ModelAdmin):
     list_editable = ('category',)
     search_fields = ('name', 'description',)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо LIKE '%...%'.
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
+
     def get_genres(self, obj):
         return ', '.join([str(genre) for genre in obj.genre.all()])
 
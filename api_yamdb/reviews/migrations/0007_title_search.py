@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-17 07:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.models
+from reviews.search import INDEXES, create_sql, drop_sql, fill_sql
+
+
+def run_on_sqlite(build):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in build(INDEXES['title']):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('document', reviews.models.FullTextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(
+            run_on_sqlite(
+                lambda index: create_sql(index) + [fill_sql(index)]
+            ),
+            run_on_sqlite(drop_sql),
+        ),
+    ]
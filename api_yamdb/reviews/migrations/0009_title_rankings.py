@@ -0,0 +1,65 @@
+# Generated by Django 3.2 on 2026-10-17 07:53
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.rankings import TRENDING_WINDOW, top_score, trending_score
+
+
+def fill_title_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Title.objects.update(
+        top_score=top_score(F('score_sum'), F('review_count'))
+    )
+    recent = defaultdict(list)
+    for title_id, pub_date in Review.objects.filter(
+        pub_date__gte=timezone.now() - TRENDING_WINDOW
+    ).values_list('title_id', 'pub_date').iterator():
+        recent[title_id].append(pub_date)
+    Title.objects.bulk_update(
+        [
+            Title(pk=pk, trending_score=trending_score(pub_dates),
+                  last_review_at=max(pub_dates))
+            for pk, pub_dates in recent.items()
+        ],
+        ('trending_score', 'last_review_at'),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='last_review_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Дата последнего отзыва'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='top_score',
+            field=models.FloatField(default=5.5, editable=False, verbose_name='Байесовское среднее'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(editable=False, null=True, verbose_name='Популярность'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-top_score', 'id'], name='title_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-trending_score', 'id'], name='title_trending_idx'),
+        ),
+        migrations.RunPython(fill_title_rankings, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,18 @@
 import datetime
+import re
+from collections import defaultdict
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import (Avg, Count, F, Lookup, OuterRef, Q, Subquery,
+                              Sum, Value)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 from users.models import User
 
+from .rankings import (PRIOR_SCORE, TRENDING_WINDOW, add_review_changes,
+                       remove_review_changes, top_score, trending_score)
+from .search import fold_text
 from .validators import validate_year
 
 
@@ -31,6 +40,139 @@ class Genre(models.Model):
         return self.name
 
 
+class FullTextSearchQuerySet(models.QuerySet):
+    """
+    QuerySet модели с полнотекстовым индексом из reviews.search,
+    связанным с ней через related_name='search'.
+    """
+    # Поля для поиска через icontains в СУБД без FTS5.
+    search_fields = ()
+
+    def search(self, text):
+        """
+        Полнотекстовый поиск: каждое слово запроса ищется как начало
+        слова, лучшие совпадения идут первыми. Релевантность доступна
+        в аннотации search_rank (чем меньше, тем лучше), по ней можно
+        строить курсорную пагинацию. В SQLite используется индекс FTS5,
+        в других СУБД - icontains без ранжирования. Запрос без слов
+        ничего не находит.
+        """
+        words = re.findall(r'\w+', fold_text(text))
+        queryset, rank = self, Value(0.0, output_field=models.FloatField())
+        if not words:
+            queryset = self.none()
+        elif connections[self.db].vendor == 'sqlite':
+            queryset, rank = self.filter(
+                search__document__match=' '.join(
+                    f'"{word}"*' for word in words
+                )
+            ), F('search__rank')
+        else:
+            query = Q()
+            for word in words:
+                word_query = Q()
+                for field in self.search_fields:
+                    word_query |= Q(**{f'{field}__icontains': word})
+                query &= word_query
+            queryset = self.filter(query)
+        return queryset.annotate(search_rank=rank).order_by(
+            'search_rank', 'id'
+        )
+
+
+class TitleQuerySet(FullTextSearchQuerySet):
+    search_fields = ('name', 'description')
+
+    def shift_rating(self, score_delta, count_delta=0, pub_date=None):
+        """
+        Сдвигает сумму оценок и количество отзывов на заданные величины
+        одним UPDATE и пересчитывает рейтинг и байесовское среднее из
+        новых значений. pub_date - дата добавленного (count_delta > 0)
+        или удалённого отзыва: тем же UPDATE обновляется популярность.
+        """
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        changes = {}
+        if pub_date is not None and count_delta > 0:
+            changes = add_review_changes(pub_date)
+        elif pub_date is not None and count_delta < 0:
+            changes = remove_review_changes(pub_date)
+        return self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=(Cast(score_sum, models.FloatField())
+                    / NullIf(review_count, 0)),
+            top_score=top_score(score_sum, review_count),
+            updated_at=timezone.now(),
+            **changes,
+        )
+
+    def recalculate_rating(self):
+        """Полностью пересчитывает рейтинг по таблице отзывов."""
+        reviews = (Review.objects.filter(title=OuterRef('pk'))
+                   .order_by().values('title'))
+        score_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0,
+            output_field=models.PositiveIntegerField(),
+        )
+        review_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0,
+            output_field=models.PositiveIntegerField(),
+        )
+        return self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            top_score=top_score(score_sum, review_count),
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg'),
+                output_field=models.FloatField(),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    def touch(self):
+        """Отмечает произведения изменёнными, не загружая их."""
+        return self.update(updated_at=timezone.now())
+
+    def recalculate_trending(self, batch_size=1000):
+        """
+        Полностью пересчитывает популярность по отзывам за последние
+        TRENDING_WINDOW. Отзывы за всё время не читаются. Возвращает
+        число пересчитанных произведений.
+        """
+        recent = defaultdict(list)
+        for title_id, pub_date in Review.objects.filter(
+            title__in=self.order_by().values('pk'),
+            pub_date__gte=timezone.now() - TRENDING_WINDOW,
+        ).order_by().values_list('title_id', 'pub_date').iterator():
+            recent[title_id].append(pub_date)
+        with transaction.atomic(using=self.db):
+            count = self.update(trending_score=None, last_review_at=None)
+            Title.objects.bulk_update(
+                [
+                    Title(pk=pk, trending_score=trending_score(pub_dates),
+                          last_review_at=max(pub_dates))
+                    for pk, pub_dates in recent.items()
+                ],
+                ('trending_score', 'last_review_at'),
+                batch_size=batch_size,
+            )
+        return count
+
+    def top(self):
+        """Произведения с отзывами, лучшие по байесовскому среднему."""
+        return self.filter(review_count__gt=0).order_by('-top_score', 'id')
+
+    def trending(self):
+        """Произведения с отзывами за TRENDING_WINDOW, популярные первыми."""
+        return self.filter(
+            last_review_at__gte=timezone.now() - TRENDING_WINDOW,
+            trending_score__isnull=False,
+        ).order_by('-trending_score', 'id')
+
+
 class Title(models.Model):
     name = models.CharField(max_length=256, verbose_name='Название')
     year = models.PositiveSmallIntegerField(verbose_name='Дата выхода',
@@ -46,6 +188,45 @@ class Title(models.Model):
         null=True,
         verbose_name='Категория'
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+    # Оценки для списков лучших и популярных, см. reviews.rankings.
+    top_score = models.FloatField(
+        default=PRIOR_SCORE,
+        editable=False,
+        verbose_name='Байесовское среднее',
+    )
+    trending_score = models.FloatField(
+        null=True,
+        editable=False,
+        verbose_name='Популярность',
+    )
+    last_review_at = models.DateTimeField(
+        null=True,
+        editable=False,
+        verbose_name='Дата последнего отзыва',
+    )
+    # Меняется и при изменении отзывов, жанров и категории произведения.
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         constraints = [
@@ -54,6 +235,14 @@ class Title(models.Model):
                 name='check_year_lte_current_year',
             )
         ]
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['name'], name='title_name_idx'),
+            models.Index(fields=['-top_score', 'id'], name='title_top_idx'),
+            models.Index(
+                fields=['-trending_score', 'id'], name='title_trending_idx',
+            ),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
@@ -61,6 +250,45 @@ class Title(models.Model):
         return self.name
 
 
+class FullTextField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы, по которому ищет MATCH."""
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class TitleSearch(models.Model):
+    """
+    Полнотекстовый индекс названий и описаний произведений: виртуальная
+    таблица FTS5 без копии текста, которую заполняют триггеры на
+    reviews_title. Модель нужна только для соединения с Title в запросах.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    document = FullTextField(db_column='reviews_title_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
+
+class ReviewQuerySet(FullTextSearchQuerySet):
+    search_fields = ('text',)
+
+
 class Review(models.Model):
     title = models.ForeignKey(
         Title,
@@ -79,6 +307,10 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
     score = models.PositiveSmallIntegerField(
         default=0,
         validators=(
@@ -88,6 +320,8 @@ class Review(models.Model):
         verbose_name='Оценка',
     )
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -95,6 +329,12 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('-pub_date',)
@@ -102,6 +342,42 @@ class Review(models.Model):
     def __str__(self):
         return (self.author.username + ': ' + self.title.name)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении
+        # пересчитать рейтинг произведения только на величину изменения.
+        loaded = dict(zip(field_names, values))
+        if 'score' in loaded and 'title_id' in loaded:
+            instance._loaded_score = loaded['score']
+            instance._loaded_title_id = loaded['title_id']
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ReviewSearch(models.Model):
+    """Полнотекстовый индекс текстов отзывов (см. reviews.search)."""
+    review = models.OneToOneField(
+        Review,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    document = FullTextField(db_column='reviews_review_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_review_fts'
+
+
+class CommentQuerySet(FullTextSearchQuerySet):
+    search_fields = ('text',)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -123,11 +399,40 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class CommentSearch(models.Model):
+    """Полнотекстовый индекс текстов комментариев (см. reviews.search)."""
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    document = FullTextField(db_column='reviews_comment_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_comment_fts'
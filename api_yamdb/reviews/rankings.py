@@ -0,0 +1,101 @@
+"""
+Оценки для списков лучших и популярных произведений.
+
+Лучшие произведения упорядочены по байесовскому среднему: к оценкам
+произведения добавляются PRIOR_WEIGHT воображаемых оценок PRIOR_SCORE,
+поэтому одна оценка 10 не поднимает произведение выше сотни оценок 9.
+
+Популярность - сумма вкладов отзывов, каждый из которых убывает вдвое
+за TRENDING_HALF_LIFE. Вклад считается от фиксированной даты
+TRENDING_EPOCH, а не от текущего момента: со временем все суммы убывают
+в одно и то же число раз, и порядок произведений не меняется, поэтому
+сохранённые оценки не нужно пересчитывать каждый день. Чтобы числа
+не переполнялись, хранится двоичный логарифм суммы, и новый отзыв
+прибавляется к нему без чтения остальных: log2(2^old + 2^e).
+
+Функции принимают и числа, и выражения Django (F, Value), поэтому
+одни и те же формулы используются в Python и в UPDATE.
+"""
+import datetime
+import math
+
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Log, Power
+
+PRIOR_SCORE = 5.5
+PRIOR_WEIGHT = 10
+
+TRENDING_HALF_LIFE = datetime.timedelta(days=7)
+# Отзывы старше окна вносят меньше 6% вклада свежего отзыва:
+# полный пересчёт их не читает, а произведения без отзывов
+# за это время не попадают в список популярных.
+TRENDING_WINDOW = datetime.timedelta(days=30)
+TRENDING_EPOCH = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Погрешность, меньше которой вклады отзывов считаются равными:
+# если вычитается весь накопленный вклад, популярность сбрасывается.
+TRENDING_EPSILON = 1e-9
+
+
+def top_score(score_sum, review_count):
+    """Байесовское среднее по сумме и количеству оценок."""
+    return ((score_sum + float(PRIOR_SCORE * PRIOR_WEIGHT))
+            / (review_count + PRIOR_WEIGHT))
+
+
+def trending_exponent(pub_date):
+    """Двоичный логарифм вклада отзыва с датой pub_date."""
+    return (pub_date - TRENDING_EPOCH) / TRENDING_HALF_LIFE
+
+
+def trending_score(pub_dates):
+    """Логарифм популярности по датам отзывов или None без отзывов."""
+    if not pub_dates:
+        return None
+    exponents = [trending_exponent(pub_date) for pub_date in pub_dates]
+    peak = max(exponents)
+    return peak + math.log2(
+        sum(2 ** (exponent - peak) for exponent in exponents)
+    )
+
+
+def add_review_changes(pub_date):
+    """
+    Изменения полей trending_score и last_review_at для UPDATE
+    произведения при добавлении отзыва с датой pub_date.
+    """
+    exponent = Value(trending_exponent(pub_date), output_field=FloatField())
+    old = F('trending_score')
+    peak = Greatest(old, exponent)
+    return {
+        'trending_score': Case(
+            When(trending_score__isnull=True, then=exponent),
+            default=peak + Log(2, Power(2, old - peak)
+                               + Power(2, exponent - peak)),
+        ),
+        'last_review_at': Case(
+            When(Q(last_review_at__isnull=True)
+                 | Q(last_review_at__lt=pub_date), then=Value(pub_date)),
+            default=F('last_review_at'),
+        ),
+    }
+
+
+def remove_review_changes(pub_date):
+    """
+    Изменение trending_score для UPDATE произведения при удалении
+    отзыва с датой pub_date. Дата последнего отзыва не меняется:
+    её обновит следующий отзыв или полный пересчёт.
+    """
+    exponent = trending_exponent(pub_date)
+    old = F('trending_score')
+    return {
+        'trending_score': Case(
+            When(
+                trending_score__gt=exponent + TRENDING_EPSILON,
+                then=old + Log(2, 1 - Power(2, exponent - old)),
+            ),
+            default=None,
+            output_field=FloatField(),
+        ),
+    }
@@ -0,0 +1,136 @@
+"""
+Полнотекстовые индексы SQLite FTS5.
+
+Индекс - виртуальная таблица FTS5 без копии текста (content=''), строки
+которой связаны с исходной таблицей через rowid = id. Триггеры на исходной
+таблице обновляют индекс при каждом изменении, в том числе при
+bulk_create, update() и каскадном удалении, поэтому индекс не нужно
+перестраивать. Текст индексируется после замены ё на е (FOLDED), так же,
+как строка поиска.
+"""
+from typing import NamedTuple, Optional
+
+
+class FullTextIndex(NamedTuple):
+    table: str
+    columns: tuple
+    # Функция ранжирования, если столбцы различаются по весу.
+    rank: Optional[str] = None
+
+    @property
+    def name(self):
+        return f'{self.table}_fts'
+
+
+INDEXES = {
+    # Совпадение в названии в 10 раз весомее совпадения в описании.
+    'title': FullTextIndex(
+        'reviews_title', ('name', 'description'), 'bm25(10.0, 1.0)'
+    ),
+    'review': FullTextIndex('reviews_review', ('text',)),
+    'comment': FullTextIndex('reviews_comment', ('text',)),
+}
+
+
+# Токенизатор FTS5 не считает ё и е одной буквой, поэтому их приводят
+# к одной и в индексе, и в строке поиска.
+FOLDED = (('ё', 'е'), ('Ё', 'Е'))
+
+
+def fold_text(text):
+    """Приводит строку поиска к виду, в котором текст лежит в индексе."""
+    for letter, replacement in FOLDED:
+        text = text.replace(letter, replacement)
+    return text
+
+
+def fold(column):
+    """То же, что fold_text, на SQL."""
+    for letter, replacement in FOLDED:
+        column = f"replace({column}, '{letter}', '{replacement}')"
+    return column
+
+
+def insert_sql(index):
+    columns = ', '.join(index.columns)
+    values = ', '.join(fold(f'new.{column}') for column in index.columns)
+    return (f'INSERT INTO {index.name} (rowid, {columns}) '
+            f'VALUES (new.id, {values});')
+
+
+def delete_sql(index):
+    # Индекс не хранит текст, поэтому при удалении ему передаются
+    # старые значения столбцов.
+    columns = ', '.join(index.columns)
+    values = ', '.join(fold(f'old.{column}') for column in index.columns)
+    return (f'INSERT INTO {index.name} ({index.name}, rowid, {columns}) '
+            f"VALUES ('delete', old.id, {values});")
+
+
+def fill_sql(index):
+    """Индексирует все строки исходной таблицы."""
+    columns = ', '.join(index.columns)
+    values = ', '.join(fold(column) for column in index.columns)
+    return (f'INSERT INTO {index.name} (rowid, {columns}) '
+            f'SELECT id, {values} FROM {index.table}')
+
+
+def create_sql(index):
+    """Создаёт пустой индекс и триггеры, которые его обновляют."""
+    statements = [
+        f'CREATE VIRTUAL TABLE {index.name} USING fts5('
+        f"{', '.join(index.columns)}, content='', "
+        "tokenize='unicode61 remove_diacritics 2')",
+    ]
+    if index.rank:
+        statements.append(
+            f'INSERT INTO {index.name} ({index.name}, rank) '
+            f"VALUES ('rank', '{index.rank}')"
+        )
+    return statements + [
+        f'CREATE TRIGGER {index.name}_insert AFTER INSERT ON {index.table} '
+        f'BEGIN {insert_sql(index)} END',
+        f'CREATE TRIGGER {index.name}_delete AFTER DELETE ON {index.table} '
+        f'BEGIN {delete_sql(index)} END',
+        f'CREATE TRIGGER {index.name}_update '
+        f"AFTER UPDATE OF {', '.join(index.columns)} ON {index.table} "
+        f'BEGIN {delete_sql(index)} {insert_sql(index)} END',
+    ]
+
+
+def trigger_names(index):
+    return [f'{index.name}_{event}'
+            for event in ('insert', 'delete', 'update')]
+
+
+def drop_sql(index):
+    return [
+        f'DROP TRIGGER IF EXISTS {name}' for name in trigger_names(index)
+    ] + [f'DROP TABLE IF EXISTS {index.name}']
+
+
+def restore_indexes(connection):
+    """
+    Пересоздаёт и заново заполняет индексы, у которых пропали триггеры.
+    SQLite удаляет триггеры вместе с таблицей, а миграции Django
+    пересоздают таблицу при изменении её полей, после чего индекс
+    перестаёт обновляться. Индексы, которых нет в базе (миграции ещё
+    не применены или откачены), не трогает. Возвращает имена
+    восстановленных индексов.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        restored = []
+        for name, index in INDEXES.items():
+            if index.name not in existing or existing.issuperset(
+                trigger_names(index)
+            ):
+                continue
+            for statement in drop_sql(index) + create_sql(index):
+                cursor.execute(statement)
+            cursor.execute(fill_sql(index))
+            restored.append(name)
+    return restored
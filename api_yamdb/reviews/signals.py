@@ -0,0 +1,124 @@
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from core.cache import invalidate_list
+
+from .models import Category, Genre, Review, Title
+from .search import restore_indexes
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """
+    Для отзыва, созданного не из БД, подгружаем сохранённые
+    оценку и произведение, чтобы правильно посчитать изменение рейтинга.
+    """
+    if instance._state.adding or hasattr(instance, '_loaded_score'):
+        return
+    loaded = (Review.objects.filter(pk=instance.pk)
+              .values('score', 'title_id').first())
+    if loaded:
+        instance._loaded_score = loaded['score']
+        instance._loaded_title_id = loaded['title_id']
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Обновляет рейтинг и дату изменения произведения при создании
+    и изменении отзыва.
+    """
+    old_score = getattr(instance, '_loaded_score', None)
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    if created:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1, instance.pub_date
+        )
+    elif old_score is None:
+        Title.objects.filter(pk=instance.title_id).touch()
+        return
+    elif old_title_id != instance.title_id:
+        Title.objects.filter(pk=old_title_id).shift_rating(
+            -old_score, -1, instance.pub_date
+        )
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score, 1, instance.pub_date
+        )
+    elif old_score != instance.score:
+        Title.objects.filter(pk=instance.title_id).shift_rating(
+            instance.score - old_score
+        )
+    else:
+        Title.objects.filter(pk=instance.title_id).touch()
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    """
+    Обновляет рейтинг произведения при удалении отзыва,
+    в том числе каскадном (при удалении пользователя).
+    """
+    score = getattr(instance, '_loaded_score', None)
+    if score is None:
+        score = instance.score
+    Title.objects.filter(pk=instance.title_id).shift_rating(
+        -score, -1, instance.pub_date
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_cached_list(sender, instance, **kwargs):
+    """
+    Сбрасывает кешированные списки категорий и жанров при изменении
+    через API и админку.
+    """
+    invalidate_list(sender)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_titles_on_save(sender, instance, created, **kwargs):
+    """
+    Отмечает изменёнными произведения категории или жанра:
+    их название входит в ответ API произведения.
+    """
+    if not created:
+        Title.objects.filter(**{sender._meta.model_name: instance}).touch()
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_on_delete(sender, instance, **kwargs):
+    Title.objects.filter(**{sender._meta.model_name: instance}).touch()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_titles_on_genres_change(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    """Отмечает изменёнными произведения, у которых изменились жанры."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Title.objects.filter(pk=instance.pk).touch()
+    elif action in ('post_add', 'post_remove'):
+        Title.objects.filter(pk__in=pk_set).touch()
+    elif action == 'pre_clear':
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(post_migrate)
+def restore_search_indexes(sender, using, **kwargs):
+    """
+    Восстанавливает триггеры полнотекстовых индексов, если миграция
+    пересоздала таблицу произведений, отзывов или комментариев.
+    """
+    connection = connections[using]
+    if sender.label != 'reviews' or connection.vendor != 'sqlite':
+        return
+    restore_indexes(connection)
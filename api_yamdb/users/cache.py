@@ -0,0 +1,67 @@
+"""
+Кеш пользователей для аутентификации по JWT.
+
+Запись кеша привязана к id пользователя и идентификатору токена (jti)
+и хранит версию пользователя. При сохранении или удалении пользователя
+версия сбрасывается, и все его записи перестают использоваться.
+Версия удаляется из кеша Django, поэтому он должен быть общим для всех
+процессов сервера (см. users.checks).
+"""
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import User
+
+USER_CACHE_TIMEOUT = 60
+
+# Хеш пароля не кешируется: при обращении к нему поле загрузится из БД.
+CACHED_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+]
+
+
+def version_key(user_id):
+    return f'auth-user-version:{user_id}'
+
+
+def user_key(user_id, token_id):
+    return f'auth-user:{user_id}:{token_id}'
+
+
+def get_cached_user(user_id, token_id):
+    """
+    Возвращает пользователя из кеша или из БД, если записи нет
+    или она устарела. Для несуществующего пользователя возвращает None.
+    """
+    keys = (user_key(user_id, token_id), version_key(user_id))
+    cached = cache.get_many(keys)
+    version = cached.get(keys[1])
+    entry = cached.get(keys[0])
+    if entry is not None and version is not None and entry[0] == version:
+        return User.from_db(DEFAULT_DB_ALIAS, CACHED_FIELDS, entry[1])
+    user = User.objects.filter(pk=user_id).only(*CACHED_FIELDS).first()
+    if user is None:
+        return None
+    if version is None:
+        version = uuid4().hex
+        cache.set(keys[1], version, USER_CACHE_TIMEOUT)
+    values = [getattr(user, field) for field in CACHED_FIELDS]
+    cache.set(keys[0], (version, values), USER_CACHE_TIMEOUT)
+    return user
+
+
+def delete_version(user_id):
+    cache.delete(version_key(user_id))
+
+
+def invalidate_user(user_id):
+    """
+    Сбрасывает версию сразу и ещё раз после фиксации транзакции: иначе
+    запрос, прочитавший пользователя до фиксации, закешировал бы старые
+    данные с новой версией.
+    """
+    delete_version(user_id)
+    transaction.on_commit(lambda: delete_version(user_id))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.checks import Error, Tags, register
+
+# Бэкенды, данные которых видны только одному процессу.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Кеш аутентификации сбрасывается удалением версии пользователя
+    из кеша, поэтому кеш должен быть общим для всех процессов.
+    """
+    backend = settings.CACHES.get(DEFAULT_CACHE_ALIAS, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_BACKENDS:
+        return []
+    return [Error(
+        'The default cache is local to one process, so invalidating '
+        'a cached user in one process does not reach the others',
+        hint=(
+            'Configure a shared cache backend in CACHES: file-based, '
+            'database, Memcached or Redis'
+        ),
+        id='users.E001',
+    )]
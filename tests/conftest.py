@@ -1,6 +1,8 @@
 import os
+import shutil
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +34,22 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_catalog',
 ]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def remove_cache_dir():
+    """Удаляет временный каталог кеша из tests.settings после тестов."""
+    from django.conf import settings
+
+    yield
+    shutil.rmtree(settings.CACHES['default']['LOCATION'], ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Файловый кеш сохраняется между тестами, очищаем его перед тестом."""
+    from django.core.cache import cache
+
+    cache.clear()
@@ -0,0 +1,66 @@
+import pytest
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+TITLES_COUNT = 30
+GENRES_PER_TITLE = 2
+
+
+@pytest.fixture
+def catalog(admin, user, moderator):
+    """
+    Категории, жанры и произведения с отзывами и комментариями.
+
+    У первого произведения есть категория, жанры, описание с кавычками
+    и переводом строки, два отзыва с разными оценками и комментарии
+    к первому из них. Последнее произведение без категории и жанров.
+    Пользователь `user` не оставлял отзывов.
+    """
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(5)
+    ]
+    titles = []
+    for i in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=1990 + i,
+            category=categories[i % len(categories)]
+        )
+        title.genre.set(
+            genres[(i + j) % len(genres)] for j in range(GENRES_PER_TITLE)
+        )
+        titles.append(title)
+    titles[0].description = 'Описание «с кавычками»\nв две строки'
+    titles[0].save()
+    titles.append(Title.objects.create(
+        name='Без категории и жанров', year=1990 + TITLES_COUNT
+    ))
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, score=score, text='Отзыв 🎬'
+        )
+        for title, author, score in (
+            (titles[0], moderator, 3), (titles[0], admin, 10),
+            (titles[-1], moderator, 7),
+        )
+    ]
+    comments = [
+        Comment.objects.create(
+            review=review, author=author, text='Комментарий'
+        )
+        for review, author in (
+            (reviews[0], admin), (reviews[0], user), (reviews[0], moderator),
+            (reviews[2], moderator),
+        )
+    ]
+    return {
+        'categories': categories,
+        'genres': genres,
+        'titles': titles,
+        'reviews': reviews,
+        'comments': comments,
+    }
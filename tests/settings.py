@@ -0,0 +1,15 @@
+"""
+Настройки для тестов. Тесты очищают кеш перед каждым тестом, поэтому
+файловый кеш у них свой, во временном каталоге, а не кеш проекта.
+"""
+import tempfile
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import CACHES
+
+CACHES = {
+    'default': {
+        **CACHES['default'],
+        'LOCATION': tempfile.mkdtemp(prefix='api_yamdb_test_cache_'),
+    }
+}
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 2)
+        review = create_single_review(
+            moderator_client, title_id, 'text', 8
+        ).json()
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при создании отзыва.'
+        )
+
+        moderator_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки.'
+        )
+
+        moderator_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        assert self.get_rating(client, title_id) == 2, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count) == (2, 1)
+
+    def test_02_rating_on_user_delete(self, admin_client, user_client,
+                                      user, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 7)
+        user.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при каскадном удалении отзывов вместе с пользователем.'
+        )
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count) == (0, 0)
+
+    def test_03_recalculate_ratings_command(self, admin_client, user_client,
+                                            client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 9)
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+        call_command('recalculate_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            9, 1, 9
+        )
+        other = Title.objects.get(pk=titles[1]['id'])
+        assert (other.score_sum, other.review_count, other.rating) == (
+            0, 0, None
+        )
@@ -0,0 +1,182 @@
+"""
+Бюджеты SQL-запросов для каждого маршрута из `api/urls.py`.
+
+Каждая запись в `QUERY_BUDGETS` описывает запрос к одному маршруту
+и максимальное число SQL-запросов, которое он может выполнить.
+Списки проверяются на страницах разного размера: число запросов
+не должно зависеть от количества объектов на странице.
+"""
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from reviews.models import Title
+
+# (имя маршрута, метод, клиент, параметры запроса, данные, бюджет)
+QUERY_BUDGETS = [
+    ('api:api-root', 'get', 'client', None, None, 0),
+    ('api:sign_up', 'post', 'client', None,
+     {'username': 'newuser', 'email': 'newuser@yamdb.fake'}, 5),
+    ('api:get_token', 'post', 'client', None,
+     lambda dataset: {'username': dataset['user'].username,
+                      'confirmation_code': dataset['confirmation_code']}, 1),
+    ('api:me', 'get', 'user_client', None, None, 1),
+    ('api:me', 'patch', 'user_client', None, {'bio': 'new bio'}, 2),
+    ('api:category-list', 'get', 'client', None, None, 2),
+    ('api:category-list', 'get', 'client', {'limit': 100}, None, 2),
+    ('api:category-list', 'post', 'admin_client', None,
+     {'name': 'Музыка', 'slug': 'music'}, 3),
+    ('api:category-detail', 'delete', 'admin_client', None, None, 6),
+    ('api:genre-list', 'get', 'client', None, None, 2),
+    ('api:genre-list', 'get', 'client', {'limit': 100}, None, 2),
+    ('api:genre-list', 'post', 'admin_client', None,
+     {'name': 'Вестерн', 'slug': 'western'}, 3),
+    ('api:genre-detail', 'delete', 'admin_client', None, None, 5),
+    ('api:title-list', 'get', 'client', None, None, 4),
+    ('api:title-list', 'get', 'client', {'limit': 100}, None, 4),
+    ('api:title-list', 'get', 'client', {'genre': 'genre-0'}, None, 4),
+    ('api:title-top', 'get', 'client', None, None, 3),
+    ('api:title-top', 'get', 'client', {'limit': 100}, None, 3),
+    ('api:title-top', 'get', 'client', {'genre': 'genre-0'}, None, 3),
+    ('api:title-trending', 'get', 'client', None, None, 3),
+    ('api:title-trending', 'get', 'client', {'limit': 100}, None, 3),
+    ('api:title-list', 'post', 'admin_client', None,
+     {'name': 'Новое', 'year': 2000, 'category': 'category-0',
+      'genre': ['genre-0', 'genre-1']}, 10),
+    ('api:title-detail', 'get', 'client', None, None, 3),
+    ('api:title-detail', 'patch', 'admin_client', None,
+     {'name': 'Другое'}, 5),
+    ('api:title-detail', 'delete', 'admin_client', None, None, 10),
+    ('api:review-list', 'get', 'client', None, None, 3),
+    ('api:review-list', 'get', 'client', {'limit': 100}, None, 3),
+    ('api:review-list', 'post', 'user_client', None,
+     {'text': 'Отзыв', 'score': 5}, 6),
+    ('api:review-detail', 'get', 'client', None, None, 2),
+    ('api:review-detail', 'patch', 'moderator_client', None,
+     {'score': 1}, 6),
+    ('api:review-detail', 'delete', 'moderator_client', None, None, 5),
+    ('api:comment-list', 'get', 'client', None, None, 3),
+    ('api:comment-list', 'get', 'client', {'limit': 100}, None, 3),
+    ('api:comment-list', 'post', 'user_client', None,
+     {'text': 'Комментарий'}, 3),
+    ('api:comment-detail', 'get', 'client', None, None, 2),
+    ('api:comment-detail', 'patch', 'moderator_client', None,
+     {'text': 'Другой'}, 3),
+    ('api:comment-detail', 'delete', 'moderator_client', None, None, 3),
+    ('api:search-review-list', 'get', 'moderator_client',
+     {'q': 'отзыв'}, None, 2),
+    ('api:search-review-list', 'get', 'moderator_client',
+     {'q': 'отзыв', 'limit': 100}, None, 2),
+    ('api:search-comment-list', 'get', 'moderator_client',
+     {'q': 'комментарий'}, None, 2),
+    ('api:search-comment-list', 'get', 'moderator_client',
+     {'q': 'комментарий', 'limit': 100}, None, 2),
+    ('api:user-list', 'get', 'admin_client', None, None, 3),
+    ('api:user-list', 'get', 'admin_client', {'limit': 100}, None, 3),
+    ('api:user-list', 'post', 'admin_client', None,
+     {'username': 'created', 'email': 'created@yamdb.fake'}, 4),
+    ('api:user-detail', 'get', 'admin_client', None, None, 2),
+    ('api:user-detail', 'patch', 'admin_client', None,
+     {'role': 'moderator'}, 3),
+    ('api:user-detail', 'delete', 'admin_client', None, None, 8),
+]
+
+
+def get_route_names(resolver=None, namespace=''):
+    """Собирает имена всех маршрутов приложения `api`."""
+    if resolver is None:
+        resolver = get_resolver()
+    names = set()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = namespace
+            if pattern.namespace:
+                prefix = f'{namespace}{pattern.namespace}:'
+            names |= get_route_names(pattern, prefix)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            if namespace.startswith('api:'):
+                names.add(f'{namespace}{pattern.name}')
+    return names
+
+
+@pytest.fixture
+def dataset(catalog, user):
+    # Оценки рейтингов для всех произведений, чтобы списки лучших
+    # и популярных проверялись на полных страницах.
+    Title.objects.filter(review_count=0).update(review_count=1)
+    Title.objects.update(top_score=F('id'), trending_score=F('id'),
+                         last_review_at=timezone.now())
+    return {
+        'category': catalog['categories'][-1],
+        'genre': catalog['genres'][-1],
+        'title': catalog['titles'][0],
+        'review': catalog['reviews'][0],
+        'comment': catalog['comments'][2],
+        'user': user,
+        'confirmation_code': default_token_generator.make_token(user),
+    }
+
+
+def route_kwargs(name, dataset):
+    """Параметры URL для маршрута, ссылающиеся на объекты из `dataset`."""
+    kwargs = {}
+    if name.startswith(('api:review-', 'api:comment-')):
+        kwargs['title_id'] = dataset['title'].id
+    if name.startswith('api:comment-'):
+        kwargs['review_id'] = dataset['review'].id
+    if name.endswith('-detail'):
+        model_name = name[len('api:'):-len('-detail')]
+        obj = dataset[model_name]
+        if model_name in ('category', 'genre'):
+            kwargs['slug'] = obj.slug
+        elif model_name == 'user':
+            kwargs['username'] = obj.username
+        else:
+            kwargs['pk'] = obj.pk
+    return kwargs
+
+
+def test_every_route_has_budget():
+    budgeted = {budget[0] for budget in QUERY_BUDGETS}
+    missing = get_route_names() - budgeted
+    assert not missing, (
+        f'Для маршрутов {sorted(missing)} не задан бюджет SQL-запросов. '
+        'Добавьте их в `QUERY_BUDGETS`.'
+    )
+
+
+def budget_id(budget):
+    name, method, _, params, _, _ = budget
+    return f'{method.upper()} {name} {params or ""}'.strip()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, method, client_name, params, data, budget', QUERY_BUDGETS,
+    ids=[budget_id(budget) for budget in QUERY_BUDGETS]
+)
+def test_query_budget(request, dataset, name, method, client_name, params,
+                      data, budget):
+    client = request.getfixturevalue(client_name)
+    url = reverse(name, kwargs=route_kwargs(name, dataset))
+    if callable(data):
+        data = data(dataset)
+    if method == 'get':
+        request_kwargs = {'data': params}
+    else:
+        request_kwargs = {'data': data, 'format': 'json'}
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **request_kwargs)
+    assert response.status_code < 400, (
+        f'{method.upper()}-запрос к `{url}` вернул ответ со статусом '
+        f'{response.status_code}: {response.content[:200]}'
+    )
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert len(context) <= budget, (
+        f'{method.upper()}-запрос к `{url}` выполнил {len(context)} '
+        f'SQL-запросов при бюджете {budget}:\n{queries}'
+    )
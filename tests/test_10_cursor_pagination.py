@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+def crawl(client, url, limit):
+    """Проходит все страницы курсорной пагинации и собирает результаты."""
+    results = []
+    response = client.get(url, data={'cursor': '', 'limit': limit})
+    while True:
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с параметром `cursor` '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            f'Проверьте, что курсорная пагинация `{url}` не считает '
+            'общее количество объектов.'
+        )
+        results.extend(data['results'])
+        if not data['next']:
+            return results
+        response = client.get(data['next'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles_cursor(self, admin_client, client):
+        create_titles(admin_client)
+        for i in range(5):
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+        results = crawl(client, '/api/v1/titles/', 2)
+        ids = [title['id'] for title in results]
+        assert ids == sorted(Title.objects.values_list('id', flat=True)), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения в порядке `id` без повторов.'
+        )
+
+    def test_02_reviews_cursor(self, admin_client, client,
+                               django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        for i in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'author{i}', email=f'author{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {i}', score=5
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        results = crawl(client, url, 3)
+        expected = list(
+            title.reviews.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert [review['id'] for review in results] == expected, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает '
+            'все отзывы от новых к старым без повторов.'
+        )
+
+        response = client.get(url, data={'limit': 3, 'offset': 3})
+        data = response.json()
+        assert data['count'] == 7 and len(data['results']) == 3, (
+            f'Проверьте, что пагинация limit/offset для `{url}` '
+            'продолжает работать без параметра `cursor`.'
+        )
+
+    def test_03_users_cursor(self, admin_client, user, moderator,
+                             django_user_model):
+        results = crawl(admin_client, '/api/v1/users/', 2)
+        expected = list(
+            django_user_model.objects.order_by('id')
+            .values_list('username', flat=True)
+        )
+        assert [item['username'] for item in results] == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/users/` '
+            'возвращает всех пользователей в порядке `id`.'
+        )
@@ -0,0 +1,91 @@
+"""
+Проверка планов выполнения SQL-запросов списковых эндпоинтов.
+
+Для каждого запроса, выполненного эндпоинтом, снимается
+`EXPLAIN QUERY PLAN`. Полный просмотр таблицы (`SCAN <таблица>` без
+индекса) допускается только для таблицы, которую эндпоинт и так отдаёт
+целиком. Сортировка через временное B-дерево означает, что индекс не
+соответствует порядку выдачи.
+"""
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING)(?:\s|$)')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+# (url, клиент, параметры запроса, таблицы, которые можно читать целиком)
+LIST_ENDPOINTS = [
+    ('/api/v1/categories/', 'client', None, {'reviews_category'}),
+    ('/api/v1/genres/', 'client', None, {'reviews_genre'}),
+    ('/api/v1/titles/', 'client', None, {'reviews_title'}),
+    ('/api/v1/titles/', 'client', {'year': 1990}, set()),
+    ('/api/v1/titles/', 'client', {'name': 'Произведение 1'}, set()),
+    ('/api/v1/titles/', 'client', {'category': 'category-0'}, set()),
+    ('/api/v1/titles/', 'client', {'genre': 'genre-0'}, set()),
+    # Виртуальная таблица FTS5 читается через свой индекс MATCH.
+    ('/api/v1/titles/', 'client', {'search': 'Произведение'},
+     {'reviews_title_fts'}),
+    ('/api/v1/titles/{title_id}/reviews/', 'client', None, set()),
+    ('/api/v1/titles/{title_id}/reviews/', 'client', {'cursor': ''}, set()),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/', 'client',
+     None, set()),
+    ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/', 'client',
+     {'cursor': ''}, set()),
+    ('/api/v1/users/', 'admin_client', None, {'users_user'}),
+]
+
+
+@pytest.fixture
+def dataset(catalog):
+    return {'title_id': catalog['titles'][0].id,
+            'review_id': catalog['reviews'][0].id}
+
+
+def explain(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def capture_plans(client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, data=params)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    plans = []
+    for query in context.captured_queries:
+        sql = query['sql']
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        # Django сохраняет текст запроса с уже подставленными параметрами.
+        plans.append((sql, explain(sql, ())))
+    return plans
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url, client_name, params, allowed', LIST_ENDPOINTS)
+def test_list_endpoint_avoids_full_scans(request, dataset, url, client_name,
+                                         params, allowed):
+    client = request.getfixturevalue(client_name)
+    url = url.format(**dataset)
+    for sql, plan in capture_plans(client, url, params):
+        scanned = {
+            match.group(1) for line in plan
+            for match in [FULL_SCAN.search(line)] if match
+        }
+        unexpected = scanned - allowed
+        assert not unexpected, (
+            f'GET-запрос к `{url}` с параметрами {params} выполняет полный '
+            f'просмотр таблиц {sorted(unexpected)}:\n{sql}\n'
+            + '\n'.join(plan)
+        )
+        if not allowed:
+            assert not any(TEMP_SORT in line for line in plan), (
+                f'GET-запрос к `{url}` с параметрами {params} сортирует '
+                f'результат без индекса:\n{sql}\n' + '\n'.join(plan)
+            )
@@ -0,0 +1,299 @@
+import csv
+import os
+import shutil
+import threading
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.dateparse import parse_datetime
+
+from core.management.commands import import_csv
+from core.management.commands.import_csv import (DATA_DIR, STAGES,
+                                                 Command)
+from core.models import ImportCheckpoint
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+CSV_MODELS = (
+    ('category.csv', Category),
+    ('genre.csv', Genre),
+    ('users.csv', User),
+    ('titles.csv', Title),
+    ('review.csv', Review),
+    ('comments.csv', Comment),
+)
+
+
+def count_rows(file_name):
+    with open(DATA_DIR / file_name, encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ImportCsv:
+
+    def test_01_import_all_files(self):
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_csv', stdout=StringIO())
+        for file_name, model in CSV_MODELS:
+            assert model.objects.count() == count_rows(file_name), (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'из файла `{file_name}`.'
+            )
+        assert Title.genre.through.objects.count() == count_rows(
+            'genre_title.csv'
+        )
+        assert len(context) < 50, (
+            'Проверьте, что команда `import_csv` сохраняет строки пакетами, '
+            f'а не по одной: выполнено {len(context)} SQL-запросов.'
+        )
+        title = Title.objects.filter(review_count__gt=0).first()
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.review_count == len(scores)
+        assert title.rating == sum(scores) / len(scores), (
+            'Проверьте, что после импорта пересчитывается рейтинг '
+            'произведений.'
+        )
+
+    def test_02_import_is_idempotent(self):
+        call_command('import_csv', stdout=StringIO())
+        Category.objects.filter(id=1).update(name='Изменено')
+        out = StringIO()
+        call_command('import_csv', '--batch-size', '5', stdout=out)
+        assert Category.objects.get(id=1).name != 'Изменено', (
+            'Проверьте, что повторный импорт обновляет существующие строки.'
+        )
+        for file_name, model in CSV_MODELS:
+            assert model.objects.count() == count_rows(file_name)
+        assert 'Review: 0 created' in out.getvalue()
+
+    def test_03_stream_import_resumes_after_crash(self, monkeypatch):
+        original_save_objects = Command.save_objects
+        calls = {'review': 0}
+
+        def crashing_save_objects(self, model, objects, fields):
+            if model is Review:
+                calls['review'] += 1
+                if calls['review'] == 3:
+                    raise RuntimeError('Сбой во время импорта')
+            return original_save_objects(self, model, objects, fields)
+
+        monkeypatch.setattr(Command, 'save_objects', crashing_save_objects)
+        with pytest.raises(RuntimeError):
+            call_command(
+                'import_csv', '--stream', '--batch-size', '10',
+                stdout=StringIO()
+            )
+        assert Review.objects.count() == 20, (
+            'Проверьте, что в потоковом режиме `import_csv` фиксирует '
+            'каждую пачку строк отдельно.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(file_name='review.csv')
+        assert checkpoint.rows == 20
+
+        monkeypatch.setattr(Command, 'save_objects', original_save_objects)
+        Category.objects.filter(id=1).update(name='Изменено')
+        out = StringIO()
+        call_command(
+            'import_csv', '--stream', '--resume', '--batch-size', '10',
+            stdout=out
+        )
+        assert Category.objects.get(id=1).name == 'Изменено', (
+            'Проверьте, что `import_csv --resume` не импортирует повторно '
+            'уже загруженные файлы.'
+        )
+        assert 'Review: 52 created' in out.getvalue(), (
+            'Проверьте, что `import_csv --resume` продолжает импорт '
+            'с последней сохранённой пачки.'
+        )
+        for file_name, model in CSV_MODELS:
+            assert model.objects.count() == count_rows(file_name)
+        assert 'rows/s' in out.getvalue() and 'ETA' in out.getvalue()
+        assert not ImportCheckpoint.objects.exists()
+
+    def test_04_jobs_respect_stage_dependencies(self, monkeypatch):
+        events = {}
+
+        def fake_stage(name):
+            def run(self, file_name):
+                start = time.monotonic()
+                time.sleep(0.05)
+                events[name] = (start, time.monotonic())
+            return run
+
+        for name, (method, _, _) in STAGES.items():
+            monkeypatch.setattr(Command, method, fake_stage(name))
+        out = StringIO()
+        call_command('import_csv', '--jobs', '3', stdout=out)
+
+        for name, (_, _, dependencies) in STAGES.items():
+            for dependency in dependencies:
+                assert events[dependency][1] <= events[name][0], (
+                    f'Проверьте, что этап `{name}` запускается только после '
+                    f'завершения этапа `{dependency}`.'
+                )
+        independent = [events[name] for name in ('category', 'genre', 'users')]
+        assert max(start for start, _ in independent) < min(
+            end for _, end in independent
+        ), (
+            'Проверьте, что `import_csv --jobs` выполняет независимые этапы '
+            'одновременно.'
+        )
+        assert 'Critical path: ' in out.getvalue()
+        assert 'Stage review: ' in out.getvalue()
+
+    def test_05_incremental_import(self, monkeypatch, tmp_path):
+        for file_name in os.listdir(DATA_DIR):
+            shutil.copy(DATA_DIR / file_name, tmp_path / file_name)
+        monkeypatch.setattr(import_csv, 'DATA_DIR', tmp_path)
+        call_command('import_csv', '--incremental', stdout=StringIO())
+        for file_name, model in CSV_MODELS:
+            assert model.objects.count() == count_rows(file_name)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_csv', '--incremental', stdout=out)
+        assert out.getvalue().count('unchanged, skipped') == len(STAGES), (
+            'Проверьте, что `import_csv --incremental` пропускает '
+            'неизменившиеся файлы.'
+        )
+        queries = [
+            query for query in context.captured_queries
+            if query['sql'] != 'BEGIN'
+        ]
+        assert len(queries) <= len(STAGES), (
+            'Проверьте, что `import_csv --incremental` без изменений в '
+            f'файлах не обращается к таблицам: {len(queries)} запросов.'
+        )
+
+        with open(tmp_path / 'review.csv', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            fieldnames = reader.fieldnames
+            reviews = list(reader)
+        deleted = reviews.pop()
+        reviews[0]['text'] = 'Изменённый отзыв'
+        reviews.append(dict(deleted, id='1000'))
+        with open(tmp_path / 'review.csv', 'w', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(reviews)
+
+        out = StringIO()
+        call_command('import_csv', '--incremental', stdout=out)
+        output = out.getvalue()
+        assert 'Review: 1 created, 1 updated' in output, (
+            'Проверьте, что `import_csv --incremental` сохраняет только '
+            'новые и изменённые строки.'
+        )
+        assert 'review.csv: 1 deleted' in output
+        assert 'titles.csv: unchanged, skipped' in output
+        assert not Review.objects.filter(id=deleted['id']).exists()
+        assert Review.objects.get(id=reviews[0]['id']).text == (
+            'Изменённый отзыв'
+        )
+        assert Review.objects.count() == len(reviews)
+        title = Title.objects.get(id=deleted['title_id'])
+        assert title.review_count == title.reviews.count()
+
+    def test_06_incremental_import_retries_skipped_rows(self, monkeypatch,
+                                                        tmp_path):
+        for file_name in os.listdir(DATA_DIR):
+            shutil.copy(DATA_DIR / file_name, tmp_path / file_name)
+        monkeypatch.setattr(import_csv, 'DATA_DIR', tmp_path)
+        call_command('import_csv', '--incremental', stdout=StringIO())
+        author = Comment.objects.values('review__author').first()[
+            'review__author'
+        ]
+        reviews = Review.objects.filter(author=author).count()
+        comments = Comment.objects.filter(review__author=author).count()
+        assert reviews and comments
+
+        users_csv = (tmp_path / 'users.csv').read_text(encoding='utf-8')
+        lines = users_csv.splitlines(keepends=True)
+        (tmp_path / 'users.csv').write_text(
+            ''.join(line for line in lines
+                    if not line.startswith(f'{author},')),
+            encoding='utf-8',
+        )
+        out = StringIO()
+        call_command('import_csv', '--incremental', stdout=out)
+        assert 'users.csv: 1 deleted' in out.getvalue()
+        assert not Review.objects.filter(author=author).exists()
+        assert 'review.csv: unchanged' not in out.getvalue()
+
+        (tmp_path / 'users.csv').write_text(users_csv, encoding='utf-8')
+        call_command('import_csv', '--incremental', stdout=StringIO())
+        assert Review.objects.filter(author=author).count() == reviews, (
+            'Проверьте, что `import_csv --incremental` повторяет строки, '
+            'пропущенные из-за отсутствующей родительской записи, когда '
+            'она снова появляется.'
+        )
+        assert Comment.objects.filter(
+            review__author=author
+        ).count() == comments
+        for file_name, model in CSV_MODELS:
+            assert model.objects.count() == count_rows(file_name)
+
+        out = StringIO()
+        call_command('import_csv', '--incremental', stdout=out)
+        assert out.getvalue().count('unchanged, skipped') == len(STAGES), (
+            'Проверьте, что после загрузки всех строк отпечатки файлов '
+            'снова сохраняются.'
+        )
+
+    def test_07_import_keeps_pub_dates(self):
+        call_command('import_csv', stdout=StringIO())
+        for file_name, model in (('review.csv', Review),
+                                 ('comments.csv', Comment)):
+            with open(DATA_DIR / file_name, encoding='utf-8') as file:
+                row = next(csv.DictReader(file))
+            assert model.objects.get(id=row['id']).pub_date == (
+                parse_datetime(row['pub_date'])
+            ), (
+                f'Проверьте, что `import_csv` сохраняет дату публикации '
+                f'из файла `{file_name}`, а не время импорта.'
+            )
+        assert not Title.objects.trending().exists()
+
+        review = Review.objects.order_by('id').first()
+        title_updated_at = review.title.updated_at
+        Review.objects.filter(pk=review.pk).update(text='Изменено')
+        updated_at = Review.objects.get(pk=review.pk).updated_at
+        call_command('import_csv', stdout=StringIO())
+        review.refresh_from_db()
+        assert review.updated_at > updated_at, (
+            'Проверьте, что обновление строки при импорте меняет '
+            '`updated_at`, от которого зависят ETag и Last-Modified.'
+        )
+        assert review.title.updated_at > title_updated_at
+
+    def test_08_jobs_parse_files_concurrently(self, monkeypatch):
+        # Этапы категорий и жанров ждут друг друга, прочитав первую
+        # пачку: если бы этап целиком выполнялся под блокировкой записи,
+        # второй этап не начался бы и ожидание прервалось бы по таймауту.
+        barrier = threading.Barrier(2, timeout=10)
+        read_batches = Command.read_batches
+
+        def read_batches_together(self, file_path, offset=0):
+            for number, batch in enumerate(
+                read_batches(self, file_path, offset)
+            ):
+                if number == 0 and file_path.name in ('category.csv',
+                                                      'genre.csv'):
+                    barrier.wait()
+                yield batch
+
+        monkeypatch.setattr(Command, 'read_batches', read_batches_together)
+        call_command('import_csv', '--jobs', '3', '--batch-size', '2',
+                     stdout=StringIO())
+        assert not barrier.broken, (
+            'Проверьте, что `import_csv --jobs` без `--stream` читает '
+            'и разбирает файлы независимых этапов одновременно.'
+        )
+        for file_name, model in CSV_MODELS:
+            assert model.objects.count() == count_rows(file_name)
+        assert not ImportCheckpoint.objects.exists()
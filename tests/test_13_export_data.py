@@ -0,0 +1,111 @@
+import csv
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.management.commands.import_csv import DATA_DIR
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+SAME_LAYOUT_FILES = ('category.csv', 'genre.csv', 'titles.csv', 'users.csv')
+
+
+def read_csv(file_path):
+    with open(file_path, encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ExportData:
+
+    def test_01_export_csv_matches_import_layout(self, tmp_path):
+        call_command('import_csv', stdout=StringIO())
+        call_command(
+            'export_data', '--output-dir', str(tmp_path), '--chunk-size', '7',
+            stdout=StringIO()
+        )
+        for file_name in SAME_LAYOUT_FILES:
+            assert read_csv(tmp_path / file_name) == read_csv(
+                DATA_DIR / file_name
+            ), (
+                f'Проверьте, что `export_data` выгружает `{file_name}` '
+                'в формате static/data/.'
+            )
+        source_links = {
+            (row['title_id'], row['genre_id'])
+            for row in read_csv(DATA_DIR / 'genre_title.csv')
+        }
+        exported_links = {
+            (row['title_id'], row['genre_id'])
+            for row in read_csv(tmp_path / 'genre_title.csv')
+        }
+        assert exported_links == source_links
+        for file_name in ('review.csv', 'comments.csv'):
+            source = read_csv(DATA_DIR / file_name)
+            exported = read_csv(tmp_path / file_name)
+            assert list(exported[0]) == list(source[0])
+            source_texts = {row['id']: row['text'] for row in source}
+            assert exported and all(
+                source_texts[row['id']] == row['text'] for row in exported
+            ), (
+                f'Проверьте, что `export_data` выгружает `{file_name}` '
+                'без искажения текста.'
+            )
+
+    def test_02_export_ndjson_gzip_in_parallel(self, tmp_path):
+        call_command('import_csv', stdout=StringIO())
+        call_command(
+            'export_data', '--output-dir', str(tmp_path), '--format',
+            'ndjson', '--gzip', '--jobs', '3', stdout=StringIO()
+        )
+        with gzip.open(tmp_path / 'review.ndjson.gz', 'rt',
+                       encoding='utf-8') as file:
+            reviews = [json.loads(line) for line in file]
+        source = read_csv(DATA_DIR / 'review.csv')
+        assert len(reviews) == len(source), (
+            'Проверьте, что `export_data --format ndjson --gzip` выгружает '
+            'все строки таблицы.'
+        )
+        assert reviews[0]['id'] == int(source[0]['id'])
+        assert reviews[0]['author'] == int(source[0]['author'])
+        assert reviews[0]['pub_date'].endswith('Z')
+
+    def test_03_export_can_be_imported_back(self, tmp_path):
+        call_command('import_csv', stdout=StringIO())
+        Category.objects.filter(
+            id=Title.objects.filter(category__isnull=False)
+            .values('category')[:1]
+        ).delete()
+        models = (Category, Genre, User, Title, Title.genre.through,
+                  Review, Comment)
+        exported = {
+            model: list(model.objects.order_by('id').values())
+            for model in models
+        }
+        call_command('export_data', '--output-dir', str(tmp_path),
+                     stdout=StringIO())
+        for model in (Comment, Review, Title, User, Genre, Category):
+            model.objects.all().delete()
+
+        call_command('import_csv', '--data-dir', str(tmp_path),
+                     stdout=StringIO())
+        fields = {
+            Title: ('id', 'name', 'year', 'category_id', 'review_count'),
+            Review: ('id', 'title_id', 'author_id', 'text', 'score',
+                     'pub_date'),
+            Comment: ('id', 'review_id', 'author_id', 'text', 'pub_date'),
+        }
+        for model in models:
+            imported = list(model.objects.order_by('id').values())
+            assert len(imported) == len(exported[model]), (
+                f'Проверьте, что выгрузка `export_data` загружается '
+                f'командой `import_csv` полностью: {model.__name__}.'
+            )
+            for name in fields.get(model, ()):
+                assert [row[name] for row in imported] == [
+                    row[name] for row in exported[model]
+                ], f'Проверьте поле `{name}` модели {model.__name__}.'
+        assert Title.objects.filter(category__isnull=True).exists()
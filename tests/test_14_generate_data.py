@@ -0,0 +1,119 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils.dateparse import parse_datetime
+
+from core.management.commands.export_data import TABLES
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+SIZES = {
+    'categories': 3, 'genres': 8, 'users': 60, 'titles': 40,
+    'reviews': 600, 'comments': 300,
+}
+
+
+def generate(*args):
+    options = [f'--{name}={size}' for name, size in SIZES.items()]
+    call_command('generate_data', *options, *args, stdout=StringIO())
+
+
+def read_csv_dir(directory):
+    return {
+        path.name: path.read_text(encoding='utf-8')
+        for path in sorted(directory.iterdir())
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14GenerateData:
+
+    def test_01_generate_into_database(self):
+        generate('--batch-size', '100')
+        for model, name in (
+            (Category, 'categories'), (Genre, 'genres'), (User, 'users'),
+            (Title, 'titles'), (Review, 'reviews'), (Comment, 'comments'),
+        ):
+            assert model.objects.count() == SIZES[name], (
+                f'Проверьте, что `generate_data` создаёт {SIZES[name]} '
+                f'объектов модели `{model.__name__}`.'
+            )
+        assert Review.objects.values('pub_date').distinct().count() > 1, (
+            'Проверьте, что `generate_data` сохраняет сгенерированные '
+            'даты публикации отзывов.'
+        )
+        title = Title.objects.annotate(
+            reviews_total=Count('reviews')
+        ).order_by('-reviews_total').first()
+        assert title.review_count == title.reviews_total
+        assert title.rating is not None, (
+            'Проверьте, что `generate_data` пересчитывает рейтинг '
+            'созданных произведений.'
+        )
+
+    def test_02_review_popularity_is_skewed(self):
+        generate()
+        counts = sorted(
+            Title.objects.annotate(total=Count('reviews'))
+            .values_list('total', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что популярность произведений распределена '
+            'по закону Ципфа.'
+        )
+        assert counts[0] <= SIZES['users']
+
+    def test_03_csv_is_deterministic_and_importable(self, tmp_path):
+        generate('--csv-dir', str(tmp_path / 'first'), '--seed', '7')
+        generate('--csv-dir', str(tmp_path / 'second'), '--seed', '7')
+        generate('--csv-dir', str(tmp_path / 'other'), '--seed', '8')
+        first = read_csv_dir(tmp_path / 'first')
+        assert first == read_csv_dir(tmp_path / 'second'), (
+            'Проверьте, что `generate_data` с одинаковым `--seed` '
+            'генерирует одинаковые данные.'
+        )
+        assert first != read_csv_dir(tmp_path / 'other')
+        assert not Title.objects.exists(), (
+            'Проверьте, что с `--csv-dir` команда не пишет в базу данных.'
+        )
+        with open(tmp_path / 'first' / 'titles.csv', encoding='utf-8') as f:
+            assert next(csv.reader(f)) == ['id', 'name', 'year', 'category']
+
+        call_command(
+            'import_csv', '--data-dir', str(tmp_path / 'first'),
+            stdout=StringIO()
+        )
+        assert Review.objects.count() == SIZES['reviews'], (
+            'Проверьте, что `import_csv --data-dir` загружает csv-файлы, '
+            'созданные `generate_data`.'
+        )
+        assert Comment.objects.count() == SIZES['comments']
+
+    @pytest.mark.parametrize('categories', [0, 3])
+    def test_04_csv_round_trip(self, tmp_path, categories):
+        generate('--csv-dir', str(tmp_path), '--seed', '3',
+                 f'--categories={categories}')
+        call_command('import_csv', '--data-dir', str(tmp_path),
+                     stdout=StringIO())
+        for model, file_name, columns in TABLES.values():
+            with open(tmp_path / f'{file_name}.csv', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            assert model.objects.count() == len(rows), (
+                f'Проверьте, что все строки `{file_name}.csv`, созданного '
+                '`generate_data`, загружаются командой `import_csv`.'
+            )
+            if ('pub_date', 'pub_date') in columns:
+                assert dict(model.objects.values_list('id', 'pub_date')) == {
+                    int(row['id']): parse_datetime(row['pub_date'])
+                    for row in rows
+                }, (
+                    'Проверьте, что `import_csv` сохраняет даты публикации '
+                    f'из `{file_name}.csv`.'
+                )
+        assert Title.objects.filter(
+            category__isnull=not categories
+        ).count() == SIZES['titles']
@@ -0,0 +1,130 @@
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from core.management.commands import benchmark as benchmark_command
+from core.management.commands.benchmark import SCENARIOS, Command
+from reviews.models import Category, Comment, Review, Title
+from tests.test_09_query_budgets import get_route_names
+from users.models import User
+
+
+@pytest.fixture
+def dataset():
+    call_command(
+        'generate_data', '--categories=3', '--genres=5', '--users=20',
+        '--titles=10', '--reviews=50', '--comments=50', stdout=StringIO()
+    )
+
+
+@pytest.fixture
+def few_scenarios(monkeypatch):
+    """Тестам, которым не важны сами маршруты, хватит нескольких GET."""
+    monkeypatch.setattr(benchmark_command, 'SCENARIOS', [
+        scenario for scenario in SCENARIOS if scenario[0] == 'get'
+    ][:3])
+
+
+def benchmark(*args):
+    call_command(
+        'benchmark', '--requests', '1', '--warmup', '0',
+        '--load-seconds', '0', *args,
+        stdout=StringIO()
+    )
+
+
+def snapshot():
+    return [
+        model.objects.count()
+        for model in (Category, Title, Review, Comment, User)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Benchmark:
+
+    def test_01_every_route_has_scenario(self):
+        covered = {scenario[1] for scenario in SCENARIOS}
+        missing = get_route_names() - covered
+        assert not missing, (
+            f'Для маршрутов {sorted(missing)} нет сценария в `benchmark`. '
+            'Добавьте их в `SCENARIOS`.'
+        )
+
+    def test_02_benchmark_saves_percentiles(self, dataset, tmp_path):
+        before = snapshot()
+        output = tmp_path / 'results.json'
+        benchmark('--output', str(output), '--load-seconds', '0.2')
+        results = json.loads(output.read_text(encoding='utf-8'))
+        assert len(results['endpoints']) == len(SCENARIOS), (
+            'Проверьте, что `benchmark` сохраняет результаты '
+            'для каждого сценария.'
+        )
+        for label, stats in results['endpoints'].items():
+            assert stats['requests'] == 1
+            assert 0 < stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'], (
+                f'Проверьте процентили задержки для `{label}`.'
+            )
+        load = results['load']
+        assert load['reads_per_s'] > 0 and load['writes_per_s'] > 0, (
+            'Проверьте, что `benchmark` сохраняет пропускную способность '
+            f'базы при параллельных чтении и записи: {load}'
+        )
+        assert load['locked'] == 0
+        assert snapshot() == before, (
+            'Проверьте, что `benchmark` не изменяет данные в базе.'
+        )
+
+    def test_03_benchmark_flags_regressions(self, dataset, few_scenarios,
+                                            tmp_path):
+        output = tmp_path / 'results.json'
+        benchmark('--output', str(output))
+        results = json.loads(output.read_text(encoding='utf-8'))
+        for stats in results['endpoints'].values():
+            stats['p95_ms'] = 1e6
+        slow = tmp_path / 'slow.json'
+        slow.write_text(json.dumps(results), encoding='utf-8')
+        benchmark('--output', str(output), '--baseline', str(slow))
+
+        for stats in results['endpoints'].values():
+            stats['p95_ms'] = 1e-6
+        fast = tmp_path / 'fast.json'
+        fast.write_text(json.dumps(results), encoding='utf-8')
+        with pytest.raises(CommandError, match='regressed'):
+            benchmark('--output', str(output), '--baseline', str(fast))
+
+    def test_04_benchmark_commits_on_database_copy(self, dataset,
+                                                   few_scenarios, tmp_path,
+                                                   monkeypatch):
+        calls = []
+        call = Command.call
+
+        def tracked_call(self, *args):
+            calls.append(
+                (connection.settings_dict['NAME'], connection.in_atomic_block)
+            )
+            return call(self, *args)
+
+        monkeypatch.setattr(Command, 'call', tracked_call)
+        before = snapshot()
+        benchmark('--output', str(tmp_path / 'results.json'))
+        names = {name for name, _ in calls}
+        assert len(names) == 1 and names != {
+            connection.settings_dict['NAME']
+        }, (
+            'Проверьте, что `benchmark` выполняет запросы на копии '
+            'базы данных.'
+        )
+        assert not any(atomic for _, atomic in calls), (
+            'Проверьте, что запросы `benchmark` фиксируют транзакции, '
+            'а не выполняются в одной откатываемой транзакции.'
+        )
+        assert not os.path.exists(names.pop()), (
+            'Проверьте, что `benchmark` удаляет копию базы после замера.'
+        )
+        assert snapshot() == before
@@ -0,0 +1,162 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.mail import (CLAIM_TIMEOUT, MAX_ATTEMPTS, MAX_RETRY_DELAY,
+                       RETRY_DELAY, claim_emails, deliver_queued_mail,
+                       enqueue_mail)
+from core.models import OutgoingEmail
+
+BACKEND = 'tests.test_16_mail_queue.FlakyBackend'
+
+
+class FlakyBackend(EmailBackend):
+    """Почтовый бэкенд, считающий соединения и отклоняющий адреса bounce@."""
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(address.startswith('bounce@') for address in message.to):
+                raise ConnectionError('relay unavailable')
+        return super().send_messages(messages)
+
+
+def send_queued_mail(*args):
+    call_command('send_queued_mail', *args, stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16MailQueue:
+
+    def test_01_signup_enqueues_email(self, client):
+        data = {'username': 'queued', 'email': 'queued@yamdb.fake'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что при регистрации письмо не отправляется во время '
+            'обработки запроса, а ставится в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipients == data['email']
+        assert email.sent_at is None
+
+        send_queued_mail()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_queued_mail` отправляет письма '
+            'из очереди.'
+        )
+        assert mail.outbox[0].to == [data['email']]
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+
+        send_queued_mail()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_batches_share_connection(self, settings):
+        settings.EMAIL_BACKEND = BACKEND
+        FlakyBackend.opened = 0
+        for i in range(7):
+            enqueue_mail('Тема', 'Текст', 'yamdb@yamdb.fake',
+                         [f'user{i}@yamdb.fake'])
+        send_queued_mail('--batch-size', '3')
+        assert len(mail.outbox) == 7
+        assert FlakyBackend.opened == 3, (
+            'Проверьте, что письма одной пачки отправляются через одно '
+            'соединение с почтовым сервером.'
+        )
+
+    def test_03_failed_email_is_retried_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = BACKEND
+        failing = enqueue_mail(
+            'Тема', 'Текст', 'yamdb@yamdb.fake', ['bounce@yamdb.fake']
+        )
+        enqueue_mail('Тема', 'Текст', 'yamdb@yamdb.fake', ['ok@yamdb.fake'])
+        started = timezone.now()
+        send_queued_mail()
+        assert [message.to for message in mail.outbox] == [
+            ['ok@yamdb.fake']
+        ], 'Проверьте, что ошибка одного письма не мешает отправке других.'
+        failing.refresh_from_db()
+        assert failing.attempts == 1
+        assert 'relay unavailable' in failing.last_error
+        assert failing.next_attempt_at >= started + RETRY_DELAY
+
+        send_queued_mail()
+        failing.refresh_from_db()
+        assert failing.attempts == 1, (
+            'Проверьте, что повторная попытка откладывается до '
+            '`next_attempt_at`.'
+        )
+
+        delays = []
+        for _ in range(4):
+            OutgoingEmail.objects.filter(pk=failing.pk).update(
+                next_attempt_at=timezone.now()
+            )
+            started = timezone.now()
+            send_queued_mail('--max-attempts', '4')
+            failing.refresh_from_db()
+            delays.append(failing.next_attempt_at - started)
+        assert failing.attempts == 4, (
+            'Проверьте, что после `--max-attempts` попыток письмо больше '
+            'не отправляется.'
+        )
+        assert delays[0] >= 2 * RETRY_DELAY - timedelta(seconds=1)
+        assert delays[1] >= 4 * RETRY_DELAY - timedelta(seconds=1)
+        assert failing.sent_at is None
+        assert max(delays) <= MAX_RETRY_DELAY + timedelta(seconds=1)
+
+    def test_04_concurrent_workers_do_not_send_twice(self, settings,
+                                                     monkeypatch):
+        settings.EMAIL_BACKEND = BACKEND
+        for i in range(4):
+            enqueue_mail('Тема', 'Текст', 'yamdb@yamdb.fake',
+                         [f'user{i}@yamdb.fake'])
+        send_messages = FlakyBackend.send_messages
+        concurrent = []
+
+        def send_with_concurrent_worker(self, messages):
+            if not concurrent:
+                concurrent.append(None)
+                concurrent[0] = deliver_queued_mail(batch_size=10)
+            return send_messages(self, messages)
+
+        monkeypatch.setattr(FlakyBackend, 'send_messages',
+                            send_with_concurrent_worker)
+        send_queued_mail('--batch-size', '2')
+        assert concurrent == [(2, 0)]
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{i}@yamdb.fake' for i in range(4)
+        ], (
+            'Проверьте, что обработчик забирает пачку писем до отправки '
+            'и другой обработчик не отправляет их повторно.'
+        )
+
+    def test_05_claim_expires(self, settings):
+        settings.EMAIL_BACKEND = BACKEND
+        email = enqueue_mail('Тема', 'Текст', 'yamdb@yamdb.fake',
+                             ['user@yamdb.fake'])
+        now = timezone.now()
+        assert claim_emails(10, MAX_ATTEMPTS, now) == [email]
+        assert claim_emails(10, MAX_ATTEMPTS, now) == []
+        send_queued_mail()
+        assert not mail.outbox
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now() - CLAIM_TIMEOUT
+        )
+        send_queued_mail()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что письма упавшего обработчика возвращаются '
+            'в очередь по истечении `CLAIM_TIMEOUT`.'
+        )
@@ -0,0 +1,97 @@
+import pytest
+from django.core.checks import run_checks
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from users.cache import version_key
+
+
+def user_queries(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+    return response, queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17AuthCache:
+
+    def test_01_authenticated_reads_use_cache(self, user_client):
+        response, queries = user_queries(user_client, 'get',
+                                         '/api/v1/users/me/')
+        assert response.status_code == 200
+        response, queries = user_queries(user_client, 'get',
+                                         '/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['username'] == 'TestUser'
+        assert not queries, (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            f'пользователя из БД:\n{queries}'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client,
+                                              user_client, user):
+        url = '/api/v1/users/'
+        assert user_client.get(url).status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get(url).status_code == 200, (
+            'Проверьте, что изменение роли пользователя сбрасывает '
+            'кеш аутентификации.'
+        )
+
+    def test_03_deleted_user_is_not_authenticated(self, admin_client,
+                                                  user_client, user):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удалённый пользователь не проходит '
+            'аутентификацию по закешированным данным.'
+        )
+
+    def test_04_cached_user_keeps_password_on_save(self, user_client,
+                                                   user):
+        user_client.get('/api/v1/users/me/')
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'new bio'}
+        )
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'new bio'
+        assert user.check_password('1234567'), (
+            'Проверьте, что сохранение пользователя из кеша не затирает '
+            'хеш пароля.'
+        )
+
+    def test_05_process_local_cache_is_rejected(self, settings):
+        assert not run_checks(tags=['caches']), (
+            'Проверьте, что в настройках `CACHES` указан общий для '
+            'процессов бэкенд кеша.'
+        )
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert [error.id for error in run_checks(tags=['caches'])] == [
+            'users.E001'
+        ], (
+            'Проверьте, что кеш в памяти процесса не проходит проверку: '
+            'сброс кеша аутентификации не дойдёт до других процессов.'
+        )
+
+    def test_06_cache_is_invalidated_after_commit(self, user):
+        with transaction.atomic():
+            user.bio = 'new bio'
+            user.save()
+            # Параллельный запрос до фиксации кеширует старые данные.
+            cache.set(version_key(user.pk), 'stale')
+        assert cache.get(version_key(user.pk)) is None, (
+            'Проверьте, что кеш аутентификации сбрасывается ещё раз после '
+            'фиксации транзакции.'
+        )
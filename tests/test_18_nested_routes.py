@@ -0,0 +1,68 @@
+import pytest
+
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.fixture
+def chain(user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    titles = [
+        Title.objects.create(name=f'Произведение {i}', year=2000,
+                             category=category)
+        for i in range(2)
+    ]
+    review = Review.objects.create(
+        title=titles[0], author=user, text='Отзыв', score=5
+    )
+    comment = Comment.objects.create(
+        review=review, author=user, text='Комментарий'
+    )
+    return {'title': titles[0], 'other_title': titles[1],
+            'review': review, 'comment': comment}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18NestedRoutes:
+
+    def test_01_empty_list_of_existing_parent(self, client, chain):
+        title_id = chain['other_title'].id
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/{missing}/reviews/',
+        '/api/v1/titles/{missing}/reviews/?cursor=',
+        '/api/v1/titles/{other_title}/reviews/{review}/',
+        '/api/v1/titles/{other_title}/reviews/{review}/comments/',
+        '/api/v1/titles/{other_title}/reviews/{review}/comments/?cursor=',
+        '/api/v1/titles/{title}/reviews/{missing}/comments/',
+        '/api/v1/titles/{other_title}/reviews/{review}/comments/{comment}/',
+    ])
+    def test_02_broken_chain_returns_404(self, client, chain, url):
+        url = url.format(
+            missing=9999, title=chain['title'].id,
+            other_title=chain['other_title'].id, review=chain['review'].id,
+            comment=chain['comment'].id,
+        )
+        assert client.get(url).status_code == 404, (
+            f'Проверьте, что GET-запрос к `{url}` с несуществующей цепочкой '
+            'родителей возвращает ответ со статусом 404.'
+        )
+
+    def test_03_create_under_broken_chain_returns_404(self, user_client,
+                                                       chain):
+        url = (f'/api/v1/titles/{chain["other_title"].id}/reviews/'
+               f'{chain["review"].id}/comments/')
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий нельзя создать к отзыву, '
+            'не принадлежащему произведению из URL.'
+        )
+        assert Comment.objects.count() == 1
+
+        url = (f'/api/v1/titles/{chain["title"].id}/reviews/'
+               f'{chain["review"].id}/comments/')
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        assert Comment.objects.filter(review=chain['review']).count() == 2
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title
+
+DUPLICATE_ERROR = {
+    'non_field_errors': [
+        'For every title only one review per user is allowed.'
+    ]
+}
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='movie')
+    return Title.objects.create(name='Произведение', year=2000,
+                                category=category)
+
+
+def post_review(client, title_id):
+    # Пользователь уже в кеше аутентификации: считаем только запросы
+    # самого создания отзыва.
+    client.get('/api/v1/users/me/')
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Отзыв', 'score': 8}, format='json'
+        )
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'] not in ('BEGIN', 'COMMIT')
+    ]
+    return response, queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReviewCreate:
+
+    def test_01_create_query_count(self, user_client, user, title):
+        response, queries = post_review(user_client, title.id)
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        assert len(queries) == 3, (
+            'Создание отзыва должно выполнять три SQL-запроса: загрузка '
+            'произведения, INSERT отзыва и обновление рейтинга. '
+            'Выполнено:\n' + '\n'.join(queries)
+        )
+        assert queries[1].startswith('INSERT INTO "reviews_review"')
+
+    def test_02_duplicate_review_returns_400(self, user_client, user,
+                                             title):
+        post_review(user_client, title.id)
+        response, queries = post_review(user_client, title.id)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв пользователя на то же '
+            'произведение возвращает ответ со статусом 400.'
+        )
+        assert response.json() == DUPLICATE_ERROR
+        assert len(queries) <= 2
+        assert Review.objects.count() == 1
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (1, 8), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг произведения.'
+        )
+
+    def test_03_missing_title_returns_404(self, user_client):
+        response, _ = post_review(user_client, 9999)
+        assert response.status_code == 404
@@ -0,0 +1,118 @@
+"""
+Маршрутизация чтения в реплику. Основная база и реплика — два
+разных файла SQLite, поэтому по содержимому ответа видно, откуда
+эндпоинт прочитал данные.
+"""
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+
+from core.middleware import PIN_COOKIE
+from reviews.models import Category
+
+REPLICA = 'replica'
+SECOND_REPLICA = 'replica2'
+
+
+@pytest.fixture
+def make_replicas(tmp_path, settings):
+    aliases = []
+
+    def make(*names):
+        for alias in names:
+            connections.settings[alias] = {
+                **connections.settings['default'],
+                'NAME': str(tmp_path / f'{alias}.sqlite3'),
+                'TEST': {},
+            }
+            aliases.append(alias)
+            call_command(
+                'migrate', database=alias, verbosity=0, stdout=StringIO()
+            )
+        settings.DATABASE_REPLICAS = list(names)
+        settings.REPLICA_PIN_SECONDS = 60
+        cache.clear()
+
+    yield make
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+@pytest.fixture
+def replica(make_replicas):
+    make_replicas(REPLICA)
+
+
+def category_page(client):
+    response = client.get('/api/v1/categories/')
+    assert response.status_code == 200
+    return response.json()
+
+
+def category_slugs(client):
+    return [category['slug'] for category in category_page(client)['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReplicaRouting:
+
+    def test_01_safe_requests_read_from_replica(self, client, replica):
+        Category.objects.create(name='Основная', slug='primary')
+        Category.objects.using(REPLICA).create(name='Реплика', slug='replica')
+        assert category_slugs(client) == ['replica'], (
+            'Проверьте, что GET-запросы к API читают данные из реплики.'
+        )
+
+    def test_02_writes_go_to_primary_and_pin_client(self, admin_client,
+                                                     client, replica):
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Новая', 'slug': 'new'}
+        )
+        assert response.status_code == 201
+        assert Category.objects.filter(slug='new').exists()
+        assert not Category.objects.using(REPLICA).exists(), (
+            'Проверьте, что запросы, изменяющие данные, пишут в основную базу.'
+        )
+        assert category_slugs(admin_client) == ['new'], (
+            'Проверьте, что после записи клиент читает свои изменения '
+            'из основной базы.'
+        )
+        assert PIN_COOKIE in response.cookies
+        assert category_slugs(client) == [], (
+            'Проверьте, что другие клиенты продолжают читать из реплики.'
+        )
+
+    def test_03_pin_expires(self, admin_client, replica, settings):
+        settings.REPLICA_PIN_SECONDS = 0
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Новая', 'slug': 'new'}
+        )
+        assert response.status_code == 201
+        admin_client.cookies.pop(PIN_COOKIE, None)
+        assert category_slugs(admin_client) == [], (
+            'Проверьте, что по истечении REPLICA_PIN_SECONDS клиент снова '
+            'читает из реплики.'
+        )
+
+    def test_04_no_replicas_configured(self, client):
+        Category.objects.create(name='Основная', slug='primary')
+        assert category_slugs(client) == ['primary']
+
+    def test_05_request_reads_from_one_replica(self, client, make_replicas):
+        make_replicas(REPLICA, SECOND_REPLICA)
+        Category.objects.using(REPLICA).create(name='Первая', slug='first')
+        for slug in ('second', 'third'):
+            Category.objects.using(SECOND_REPLICA).create(
+                name=slug, slug=slug
+            )
+        for _ in range(20):
+            page = category_page(client)
+            assert page['count'] == len(page['results']), (
+                'Проверьте, что реплика выбирается один раз на запрос: '
+                'подсчёт и страница результатов читаются из одной реплики.'
+            )
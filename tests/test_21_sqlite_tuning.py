@@ -0,0 +1,69 @@
+"""
+Настройки SQLite из SQLITE_PRAGMAS: они применяются к каждому новому
+соединению, и при них параллельные чтение и запись одного файла БД
+не завершаются ошибкой "database is locked". Пропускную способность
+измеряет команда benchmark.
+"""
+import pytest
+from django.db import connections, transaction
+
+from core.management.commands.benchmark import concurrent_load
+
+STRESS = 'stress'
+DURATION = 1.0
+
+
+@pytest.fixture
+def stress_db(tmp_path):
+    def configure(name):
+        connections.settings[STRESS] = {
+            **connections.settings['default'],
+            'NAME': str(tmp_path / name),
+            'TEST': {},
+        }
+        with transaction.atomic(using=STRESS), \
+                connections[STRESS].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE stress (id INTEGER PRIMARY KEY, value TEXT)'
+            )
+            cursor.executemany(
+                'INSERT INTO stress (value) VALUES (%s)',
+                [('x' * 100,)] * 10000
+            )
+        connections[STRESS].close()
+
+    yield configure
+    connections[STRESS].close()
+    del connections[STRESS]
+    del connections.settings[STRESS]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pragmas_are_applied(stress_db):
+    stress_db('pragmas.sqlite3')
+    with connections[STRESS].cursor() as cursor:
+        for name, value in (('journal_mode', 'wal'), ('synchronous', 1),
+                            ('temp_store', 2), ('busy_timeout', 5000)):
+            cursor.execute(f'PRAGMA {name}')
+            assert cursor.fetchone()[0] == value, (
+                f'Проверьте, что для нового соединения SQLite выполняется '
+                f'`PRAGMA {name}` из `SQLITE_PRAGMAS`.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_writers_are_not_locked(stress_db):
+    stress_db('tuned.sqlite3')
+    stats = concurrent_load(
+        connections.settings[STRESS],
+        ('SELECT COUNT(*), MAX(LENGTH(value)) FROM stress', ()),
+        ("INSERT INTO stress (value) VALUES ('y')", ()),
+        DURATION,
+    )
+    assert stats['writes'] and stats['reads'], (
+        f'Проверьте, что параллельные чтение и запись выполняются: {stats}'
+    )
+    assert not stats['locked'], (
+        'С SQLITE_PRAGMAS параллельные чтение и запись не должны '
+        f'завершаться ошибкой "database is locked": {stats}'
+    )
@@ -0,0 +1,95 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from api.serializers import ReviewSerializer, TitleSerializer
+from reviews.models import Category, Genre, Review, Title
+
+SPECIAL_PAYLOADS = [
+    {'text': 'Юникод, эмодзи 🎬 и разделители \u2028 \u2029'},
+    {'datetime': datetime.datetime(2020, 1, 2, 3, 4, 5, 678901,
+                                   tzinfo=datetime.timezone.utc),
+     'naive': datetime.datetime(2020, 1, 2, 3, 4, 5),
+     'date': datetime.date(2020, 1, 2),
+     'time': datetime.time(3, 4, 5, 6)},
+    {'decimal': Decimal('7.50'), 'float': 7.333333333333333, 'int': 10},
+    {'uuid': uuid.UUID(int=1), 'lazy': gettext_lazy('Жанр')},
+    {1: 'int key', 'nested': [None, True, False, {'a': [1, 2]}]},
+    [],
+]
+
+
+@pytest.fixture
+def payloads(user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    titles = []
+    for i in range(20):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category,
+            description='Описание «с кавычками» и \\ слешем ' * 5,
+        )
+        title.genre.set(genres)
+        Review.objects.create(
+            title=title, author=user, score=i % 10 + 1,
+            text='Длинный текст отзыва с переводом строки\n' * 50,
+        )
+        titles.append(title)
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    )
+    reviews = Review.objects.select_related('author')
+    return {
+        'titles': TitleSerializer(titles, many=True).data,
+        'reviews': ReviewSerializer(reviews, many=True).data,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22FastJSON:
+
+    @pytest.mark.parametrize('data', SPECIAL_PAYLOADS)
+    def test_01_render_matches_json_renderer(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_02_serializer_payloads_match(self, payloads):
+        for name, data in payloads.items():
+            assert (FastJSONRenderer().render(data)
+                    == JSONRenderer().render(data)), (
+                f'Проверьте, что `FastJSONRenderer` кодирует `{name}` '
+                'так же, как `JSONRenderer`.'
+            )
+
+    def test_03_indent_and_fallback(self, monkeypatch):
+        data = SPECIAL_PAYLOADS[1]
+        media_type = 'application/json; indent=4'
+        assert (FastJSONRenderer().render(data, media_type)
+                == JSONRenderer().render(data, media_type))
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_04_parser_matches_json_parser(self):
+        body = JSONRenderer().render(SPECIAL_PAYLOADS[0])
+        assert (FastJSONParser().parse(BytesIO(body))
+                == JSONParser().parse(BytesIO(body)))
+        for invalid in (b'{', b'[NaN]'):
+            with pytest.raises(ParseError):
+                FastJSONParser().parse(BytesIO(invalid))
+
+    def test_05_api_responses_use_fast_renderer(self, client, payloads):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert isinstance(response.accepted_renderer, FastJSONRenderer)
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import (CommentReadSerializer, CommentSerializer,
+                             ReviewReadSerializer, ReviewSerializer,
+                             TitleReadSerializer, TitleSerializer)
+from reviews.models import Comment, Review, Title
+
+# (быстрый сериализатор, эталонный сериализатор, эталонный QuerySet)
+CONTRACTS = {
+    'titles': (
+        TitleReadSerializer, TitleSerializer,
+        lambda: Title.objects.select_related('category')
+        .prefetch_related('genre').order_by('id'),
+    ),
+    'reviews': (
+        ReviewReadSerializer, ReviewSerializer,
+        lambda: Review.objects.select_related('author').order_by('id'),
+    ),
+    'comments': (
+        CommentReadSerializer, CommentSerializer,
+        lambda: Comment.objects.select_related('author').order_by('id'),
+    ),
+}
+
+
+def to_json(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ReadSerializers:
+
+    @pytest.mark.parametrize('name', CONTRACTS)
+    def test_01_list_output_is_identical(self, catalog, name):
+        read_serializer, serializer, get_queryset = CONTRACTS[name]
+        expected = serializer(get_queryset(), many=True).data
+        data = read_serializer(
+            read_serializer.get_values(get_queryset()), many=True
+        ).data
+        assert expected, 'Эталонный список не должен быть пустым.'
+        assert JSONRenderer().render(data) == JSONRenderer().render(
+            expected
+        ), (
+            f'Проверьте, что `{read_serializer.__name__}` строит тот же '
+            f'JSON, что и `{serializer.__name__}`.'
+        )
+
+    @pytest.mark.parametrize('name', CONTRACTS)
+    def test_02_single_output_is_identical(self, catalog, name):
+        read_serializer, serializer, get_queryset = CONTRACTS[name]
+        for instance in get_queryset():
+            row = read_serializer.get_values(get_queryset()).get(
+                pk=instance.pk
+            )
+            assert JSONRenderer().render(
+                read_serializer(row).data
+            ) == JSONRenderer().render(serializer(instance).data)
+
+    def test_03_empty_page(self, catalog):
+        assert TitleReadSerializer(
+            TitleReadSerializer.get_values(Title.objects.none()), many=True
+        ).data == []
+
+    def test_04_api_responses_match_reference(self, client, catalog):
+        title, review = catalog['titles'][0], catalog['reviews'][0]
+        base = f'/api/v1/titles/{title.id}/reviews/'
+        checks = (
+            (f'/api/v1/titles/{title.id}/', TitleSerializer(
+                CONTRACTS['titles'][2]().get(pk=title.pk)
+            ).data),
+            (f'{base}{review.id}/', ReviewSerializer(review).data),
+            (f'{base}{review.id}/comments/', CommentSerializer(
+                review.comments.order_by('-pub_date', '-id'), many=True
+            ).data),
+            (f'/api/v1/titles/?genre=genre-0&year={title.year}',
+             TitleSerializer(
+                 [CONTRACTS['titles'][2]().get(pk=title.pk)], many=True
+             ).data),
+        )
+        for url, expected in checks:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            if 'results' in data:
+                data = data['results']
+            assert data == to_json(expected), (
+                f'Проверьте, что ответ `{url}` совпадает с ответом '
+                'эталонного сериализатора.'
+            )
+
+    def test_05_cursor_pages_match_reference(self, client, catalog):
+        title = catalog['titles'][0]
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=1'
+        )
+        assert response.status_code == 200
+        expected = ReviewSerializer(
+            Review.objects.filter(title=title).order_by('-pub_date', '-id')
+            .first()
+        ).data
+        assert response.json()['results'] == [to_json(expected)]
+        response = client.get(response.json()['next'])
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 1
@@ -0,0 +1,138 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def content(user, moderator):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    titles = []
+    for i in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category,
+            description='Длинное описание',
+        )
+        title.genre.set([genre])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(title=titles[0], author=author, score=score,
+                              text='Отзыв')
+        for author, score in ((user, 8), (moderator, 5))
+    ]
+    Title.objects.all().recalculate_rating()
+    Comment.objects.create(review=reviews[0], author=user, text='Ответ')
+    return {'title': titles[0], 'review': reviews[0]}
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    return response.json(), [query['sql'] for query in context]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SparseFields:
+
+    def test_01_titles_fields(self, client, content):
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert [list(title) for title in data['results']] == [
+            ['id', 'name', 'rating']
+        ] * 3, (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля в порядке сериализатора.'
+        )
+        assert data['results'][0]['rating'] == 6
+        assert not any('genre' in sql for sql in queries), (
+            'Проверьте, что без поля `genre` жанры не запрашиваются.'
+        )
+        assert not any('description' in sql for sql in queries), (
+            'Проверьте, что поля, которых нет в ответе, не выбираются из БД.'
+        )
+
+    def test_02_titles_exclude(self, client, content):
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?exclude=description,genre'
+        )
+        assert list(data['results'][0]) == [
+            'id', 'name', 'year', 'rating', 'category'
+        ]
+        assert data['results'][0]['category'] == {
+            'name': 'Фильм', 'slug': 'movie'
+        }
+        assert not any('genre' in sql for sql in queries)
+
+    def test_03_title_retrieve_only_genre(self, client, content):
+        title = content['title']
+        data, _ = get_with_queries(
+            client, f'/api/v1/titles/{title.id}/?fields=genre'
+        )
+        assert data == {'genre': [{'name': 'Драма', 'slug': 'drama'}]}
+
+    def test_04_fields_and_exclude_together(self, client, content):
+        data, _ = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name,year&exclude=year'
+        )
+        assert list(data['results'][0]) == ['id', 'name']
+
+    def test_05_reviews_with_cursor(self, client, content):
+        url = (f'/api/v1/titles/{content["title"].id}/reviews/'
+               '?fields=text&cursor=&limit=1')
+        data, _ = get_with_queries(client, url)
+        assert data['results'] == [{'text': 'Отзыв'}]
+        data, _ = get_with_queries(client, data['next'])
+        assert data['results'] == [{'text': 'Отзыв'}], (
+            'Проверьте, что курсорная пагинация работает, даже если полей '
+            'сортировки нет в ответе.'
+        )
+
+    def test_06_comments(self, client, content):
+        review = content['review']
+        data, _ = get_with_queries(
+            client,
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+            'comments/?exclude=id,pub_date',
+        )
+        assert data['results'] == [{'text': 'Ответ', 'author': 'TestUser'}]
+
+    def test_07_users(self, admin_client, content):
+        data, queries = get_with_queries(
+            admin_client, '/api/v1/users/?fields=username,role'
+        )
+        assert all(list(item) == ['username', 'role']
+                   for item in data['results'])
+        assert not any('"bio"' in sql for sql in queries[1:]), (
+            'Проверьте, что `?fields=` сужает выборку пользователей '
+            'через `only()`.'
+        )
+        data, _ = get_with_queries(
+            admin_client, '/api/v1/users/TestUser/?exclude=bio,email'
+        )
+        assert list(data) == ['username', 'first_name', 'last_name', 'role']
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/?fields=id,unknown',
+        '/api/v1/titles/?exclude=password',
+    ])
+    def test_08_unknown_fields(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `?fields=` или `?exclude=` '
+            'приводит к ответу со статусом 400.'
+        )
+        assert 'fields' in response.json()
+
+    def test_09_write_actions_ignore_fields(self, admin_client, content):
+        title = content['title']
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/?fields=id', data={'name': 'Новое'}
+        )
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Новое'
@@ -0,0 +1,118 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import get_version
+from reviews.models import Category, Genre
+
+LIST_URLS = {
+    Category: '/api/v1/categories/',
+    Genre: '/api/v1/genres/',
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def content():
+    for model in LIST_URLS:
+        for i in range(3):
+            model.objects.create(name=f'Имя{i}', slug=f'slug-{i}')
+
+
+def get_list(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    return response.json(), len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ListCache:
+
+    @pytest.mark.parametrize('model', LIST_URLS)
+    def test_01_repeated_list_has_no_queries(self, client, content, model):
+        url = LIST_URLS[model]
+        data, queries = get_list(client, url)
+        assert queries > 0
+        assert get_list(client, url) == (data, 0), (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся '
+            'из кеша без запросов к БД.'
+        )
+
+    def test_02_key_includes_query_params(self, client, content):
+        url = LIST_URLS[Category]
+        full, _ = get_list(client, url)
+        found, queries = get_list(client, f'{url}?search=Имя1')
+        assert queries > 0
+        assert [item['slug'] for item in found['results']] == ['slug-1']
+        page, queries = get_list(client, f'{url}?limit=1')
+        assert queries > 0 and len(page['results']) == 1
+        assert get_list(client, url) == (full, 0)
+
+    @pytest.mark.parametrize('model', LIST_URLS)
+    def test_03_create_and_destroy_invalidate(self, client, admin_client,
+                                              content, model):
+        url = LIST_URLS[model]
+        get_list(client, url)
+        response = admin_client.post(url, data={'name': 'Новая',
+                                                'slug': 'new'})
+        assert response.status_code == 201
+        data, queries = get_list(client, url)
+        assert queries > 0 and data['count'] == 4, (
+            'Проверьте, что создание объекта сбрасывает кеш списка.'
+        )
+        assert admin_client.delete(f'{url}new/').status_code == 204
+        data, _ = get_list(client, url)
+        assert data['count'] == 3, (
+            'Проверьте, что удаление объекта сбрасывает кеш списка.'
+        )
+
+    def test_04_admin_edit_invalidates(self, client, user_superuser,
+                                       content):
+        url = LIST_URLS[Genre]
+        get_list(client, url)
+        genre = Genre.objects.get(slug='slug-0')
+        site = Client()
+        site.force_login(user_superuser)
+        response = site.post(
+            f'/admin/reviews/genre/{genre.id}/change/',
+            data={'name': 'Изменённый', 'slug': 'slug-0'},
+        )
+        assert response.status_code == 302
+        data, _ = get_list(client, url)
+        assert 'Изменённый' in [item['name'] for item in data['results']], (
+            'Проверьте, что изменение в админке сбрасывает кеш списка.'
+        )
+
+    def test_05_version_bumped_after_commit(self, content):
+        version = get_version(Category)
+        with transaction.atomic():
+            Category.objects.create(name='Ещё', slug='more')
+            in_transaction = get_version(Category)
+        assert version < in_transaction < get_version(Category), (
+            'Проверьте, что версия увеличивается и при изменении, '
+            'и после фиксации транзакции.'
+        )
+
+    def test_06_file_based_backend(self, client, content, tmp_path):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}):
+            url = LIST_URLS[Category]
+            data, _ = get_list(client, url)
+            assert get_list(client, url) == (data, 0)
+            Category.objects.create(name='Файл', slug='file')
+            data, queries = get_list(client, url)
+            assert queries > 0 and data['count'] == 4
+            assert any(tmp_path.iterdir())
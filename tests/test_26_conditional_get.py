@@ -0,0 +1,172 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def content(user, moderator):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 category=category)
+    title.genre.set([genre])
+    Title.objects.create(name='Другое', year=2001)
+    review = Review.objects.create(title=title, author=moderator, score=7,
+                                   text='Отзыв')
+    comment = Comment.objects.create(review=review, author=user,
+                                     text='Комментарий')
+    return {'title': title, 'review': review, 'comment': comment,
+            'category': category, 'genre': genre}
+
+
+def urls(content):
+    title, review = content['title'], content['review']
+    reviews = f'/api/v1/titles/{title.id}/reviews/'
+    comments = f'{reviews}{review.id}/comments/'
+    return {
+        'title-list': '/api/v1/titles/',
+        'title-detail': f'/api/v1/titles/{title.id}/',
+        'review-list': reviews,
+        'review-detail': f'{reviews}{review.id}/',
+        'comment-list': comments,
+        'comment-detail': f'{comments}{content["comment"].id}/',
+    }
+
+
+def get_etag(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response['ETag']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ConditionalGet:
+
+    @pytest.mark.parametrize('name', [
+        'title-list', 'title-detail', 'review-list', 'review-detail',
+        'comment-list', 'comment-detail',
+    ])
+    def test_01_not_modified(self, client, content, name):
+        url = urls(content)[name]
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ `{url}` содержит ETag.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == 304, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает ответ со статусом 304.'
+        )
+        assert not_modified.content == b''
+        assert not_modified['ETag'] == response['ETag']
+        assert len(context) == 1, (
+            'Проверьте, что ответ 304 выполняет один запрос к БД.'
+        )
+        if name.endswith('-detail'):
+            assert client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code == 304
+        else:
+            assert not response.has_header('Last-Modified'), (
+                'Проверьте, что список не отдаёт Last-Modified: удаление '
+                'строки не меняет наибольший `updated_at`.'
+            )
+
+    def test_02_title_changes(self, client, admin_client, content):
+        title_urls = [urls(content)[name]
+                      for name in ('title-list', 'title-detail')]
+        etags = [get_etag(client, url) for url in title_urls]
+        response = admin_client.patch(title_urls[1], data={'name': 'Новое'})
+        assert response.status_code == 200
+        for url, etag in zip(title_urls, etags):
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            ).status_code == 200, (
+                f'Проверьте, что после изменения произведения `{url}` '
+                'возвращает новые данные.'
+            )
+
+    def test_03_reviews_bump_title(self, client, user_client, content):
+        url = urls(content)['review-list']
+        changes = (
+            lambda: user_client.post(url, data={'text': 'Ещё', 'score': 2}),
+            lambda: user_client.patch(
+                f'{url}{Review.objects.get(text="Ещё").id}/',
+                data={'text': 'Исправлено'},
+            ),
+            lambda: user_client.delete(
+                f'{url}{Review.objects.get(text="Исправлено").id}/'
+            ),
+        )
+        checked = (url, urls(content)['title-detail'])
+        for change in changes:
+            etags = {check: get_etag(client, check) for check in checked}
+            assert change().status_code in (200, 201, 204)
+            for check, etag in etags.items():
+                assert client.get(
+                    check, HTTP_IF_NONE_MATCH=etag
+                ).status_code == 200, (
+                    f'Проверьте, что изменение отзыва меняет ETag `{check}`.'
+                )
+
+    def test_04_comments_change_list(self, client, user_client, content):
+        url = urls(content)['comment-list']
+        etag = get_etag(client, url)
+        response = user_client.post(url, data={'text': 'Новый'})
+        assert response.status_code == 201
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        etag = get_etag(client, url)
+        assert user_client.delete(
+            f'{url}{response.json()["id"]}/'
+        ).status_code == 204
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    @pytest.mark.parametrize('change', [
+        lambda content: content['genre'].save(),
+        lambda content: content['category'].delete(),
+        lambda content: content['genre'].delete(),
+        lambda content: content['title'].genre.clear(),
+        lambda content: Title.objects.filter(name='Другое').delete(),
+    ])
+    def test_05_title_list_related_changes(self, client, content, change):
+        url = urls(content)['title-list']
+        etag = get_etag(client, url)
+        change(content)
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение жанров, категорий и удаление '
+            'произведений меняет ETag списка произведений.'
+        )
+
+    def test_06_missing_objects_still_404(self, client, content):
+        assert client.get('/api/v1/titles/9999/',
+                          HTTP_IF_NONE_MATCH='*').status_code == 404
+        assert client.get('/api/v1/titles/9999/reviews/',
+                          HTTP_IF_NONE_MATCH='*').status_code == 404
+
+    @pytest.mark.parametrize('name', ['title-list', 'comment-list'])
+    def test_07_list_ignores_if_modified_since(self, client, user, content,
+                                               name):
+        Comment.objects.create(review=content['review'], author=user,
+                               text='Ещё комментарий')
+        url = urls(content)[name]
+        if name == 'title-list':
+            Title.objects.filter(name='Другое').delete()
+        else:
+            content['comment'].delete()
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600)
+        )
+        assert response.status_code == 200, (
+            f'Проверьте, что после удаления строки `{url}` с '
+            'If-Modified-Since не возвращает устаревший ответ 304.'
+        )
+        assert len(response.json()['results']) == 1
@@ -0,0 +1,152 @@
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from reviews.search import INDEXES, trigger_names
+
+# Размер таблицы для проверки скорости поиска.
+LARGE_TITLES = 200_000
+
+SEARCH_TIME_LIMIT = 0.05
+
+WORDS = ('туман', 'дорога', 'город', 'река', 'звезда', 'ночь', 'лес',
+         'море', 'война', 'песня', 'зима', 'сад')
+
+
+@pytest.fixture
+def titles():
+    return {
+        'hedgehog': Title.objects.create(
+            name='Ёжик в тумане', year=1975,
+            description='Мультфильм о ёжике и медвежонке',
+        ),
+        'fog': Title.objects.create(
+            name='Туман', year=2007, description='Фильм ужасов',
+        ),
+        'description': Title.objects.create(
+            name='Другое', year=2000,
+            description='Сюжет, где ежик идёт сквозь туман',
+        ),
+        'other': Title.objects.create(name='Остальное', year=2001),
+    }
+
+
+def search_ids(client, text):
+    response = client.get('/api/v1/titles/', data={'search': text})
+    assert response.status_code == 200, (
+        f'Проверьте, что поиск `{text}` возвращает ответ со статусом 200.'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleSearch:
+
+    def test_01_search_name_and_description(self, client, titles):
+        ids = search_ids(client, 'ежик')
+        assert ids == [titles['hedgehog'].id, titles['description'].id], (
+            'Проверьте, что `?search=` ищет по названию и описанию без '
+            'учёта регистра и различия ё и е, а совпадения в названии '
+            'идут первыми.'
+        )
+
+    def test_02_prefixes_and_all_words(self, client, titles):
+        assert search_ids(client, 'тум ЕЖ') == [
+            titles['hedgehog'].id, titles['description'].id
+        ]
+        assert search_ids(client, 'туман ужасов') == [titles['fog'].id]
+        assert search_ids(client, 'несуществующее') == []
+
+    @pytest.mark.parametrize('text, finds_fog', [
+        ('"', False), ('туман"', True), ('(туман', True), ('NEAR(', False),
+        ('*', False), ('-', False), ('^туман', True), ('туман -', True),
+        ("туман'; DROP TABLE reviews_title; --", False),
+    ])
+    def test_03_query_syntax_is_escaped(self, client, titles, text,
+                                        finds_fog):
+        assert (titles['fog'].id in search_ids(client, text)) == finds_fog, (
+            'Проверьте, что синтаксис FTS5 в строке поиска экранируется, '
+            'а запрос без слов ничего не находит.'
+        )
+
+    def test_04_index_follows_changes(self, client, titles):
+        hedgehog = titles['hedgehog']
+        hedgehog.name = 'Медвежонок'
+        hedgehog.description = ''
+        hedgehog.save()
+        assert search_ids(client, 'ежик') == [titles['description'].id]
+        assert search_ids(client, 'медвежонок') == [hedgehog.id]
+        Title.objects.bulk_create([Title(name='Ёжик', year=2010)])
+        Title.objects.filter(pk=titles['description'].pk).delete()
+        Title.objects.filter(pk=titles['fog'].pk).update(name='Ёжики')
+        assert len(search_ids(client, 'ежик')) == 2, (
+            'Проверьте, что индекс поиска обновляется при bulk_create, '
+            'update() и удалении произведений.'
+        )
+        Title.objects.filter(pk=titles['fog'].pk).shift_rating(5, 1)
+        assert len(search_ids(client, 'ежик')) == 2
+
+    def test_05_combines_with_filters(self, client, titles):
+        response = client.get('/api/v1/titles/',
+                              data={'search': 'туман', 'year': 2007})
+        assert [title['id'] for title in response.json()['results']] == [
+            titles['fog'].id
+        ]
+
+    def test_06_admin_uses_index(self, user_superuser, titles):
+        site = Client()
+        site.force_login(user_superuser)
+        with CaptureQueriesContext(connection) as context:
+            response = site.get('/admin/reviews/title/', data={'q': 'ежик'})
+        assert response.status_code == 200
+        assert len(response.context['cl'].result_list) == 2
+        sql = ' '.join(query['sql'] for query in context)
+        assert 'MATCH' in sql and 'LIKE' not in sql, (
+            'Проверьте, что поиск в админке использует полнотекстовый '
+            'индекс, а не LIKE.'
+        )
+
+    def test_07_search_is_fast_on_large_table(self, client):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO reviews_title (name, year, description, '
+                'score_sum, review_count, top_score, updated_at) '
+                "VALUES (%s, 2000, %s, 0, 0, 5.5, '2020-01-01')",
+                (
+                    (f'{WORDS[i % 12]} {WORDS[i // 12 % 12]} {i}',
+                     f'{WORDS[i // 144 % 12]} {WORDS[i * 7 % 12]} ' * 5)
+                    for i in range(LARGE_TITLES)
+                ),
+            )
+        Title.objects.create(name='Уникальное название', year=2000)
+        # Время ранжирования растёт с числом совпадений, поэтому проверяются
+        # избирательные запросы, как поиск конкретного произведения.
+        for text in ('уникальное', 'туман 1234', 'зима сад 19999'):
+            started = time.monotonic()
+            list(Title.objects.search(text).values_list('id')[:10])
+            elapsed = time.monotonic() - started
+            assert elapsed < SEARCH_TIME_LIMIT, (
+                f'Поиск `{text}` по {LARGE_TITLES} произведениям занял '
+                f'{elapsed * 1000:.0f} мс.'
+            )
+
+    def test_08_triggers_restored_after_migrate(self, client, titles):
+        # Так SQLite теряет триггеры, когда миграция пересоздаёт таблицу.
+        index = INDEXES['title']
+        with connection.cursor() as cursor:
+            for name in trigger_names(index):
+                cursor.execute(f'DROP TRIGGER {name}')
+        added = Title.objects.create(name='Ёжик без индекса', year=2011)
+        assert added.id not in search_ids(client, 'ежик')
+        call_command('migrate', verbosity=0)
+        assert added.id in search_ids(client, 'ежик'), (
+            'Проверьте, что после migrate пропавшие триггеры индекса '
+            'создаются заново, а индекс заполняется.'
+        )
+        Title.objects.filter(pk=added.pk).update(name='Медвежонок')
+        assert search_ids(client, 'медвежонок') == [added.id]
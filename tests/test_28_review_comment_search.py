@@ -0,0 +1,207 @@
+import datetime
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+from reviews.search import INDEXES, create_sql, drop_sql
+
+REVIEWS_URL = '/api/v1/search/reviews/'
+COMMENTS_URL = '/api/v1/search/comments/'
+
+
+@pytest.fixture
+def content(admin, user, moderator):
+    titles = [Title.objects.create(name=f'Произведение {i}', year=2000)
+              for i in range(2)]
+    reviews = {
+        'ёлка': Review.objects.create(
+            title=titles[0], author=user, score=5,
+            text='Ёлка в финале лишняя, а ёлка в начале хороша',
+        ),
+        'финал': Review.objects.create(
+            title=titles[0], author=moderator, score=7,
+            text='Финал затянут, но ёлка красивая и музыка отличная',
+        ),
+        'other': Review.objects.create(
+            title=titles[1], author=user, score=3,
+            text='Скучный финал',
+        ),
+    }
+    Review.objects.filter(pk=reviews['other'].pk).update(
+        pub_date=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    )
+    comments = {
+        'спам': Comment.objects.create(
+            review=reviews['ёлка'], author=user, text='Купите ёлки дёшево',
+        ),
+        'ответ': Comment.objects.create(
+            review=reviews['other'], author=admin, text='Финал как финал',
+        ),
+    }
+    return {'titles': titles, 'reviews': reviews, 'comments': comments}
+
+
+def search(client, url, **params):
+    response = client.get(url, data=params)
+    assert response.status_code == 200, (
+        f'Проверьте, что поиск `{url}` с параметрами {params} возвращает '
+        f'ответ со статусом 200, а не {response.status_code}.'
+    )
+    return response.json()
+
+
+def search_ids(client, url, **params):
+    return [item['id'] for item in search(client, url, **params)['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ReviewCommentSearch:
+
+    @pytest.mark.parametrize('url', [REVIEWS_URL, COMMENTS_URL])
+    def test_01_only_moderators_and_admins(self, client, user_client,
+                                           moderator_client, admin_client,
+                                           content, url):
+        assert client.get(url, data={'q': 'финал'}).status_code == 401
+        assert user_client.get(url, data={'q': 'финал'}).status_code == 403, (
+            'Проверьте, что поиск по отзывам и комментариям недоступен '
+            'обычному пользователю.'
+        )
+        search(moderator_client, url, q='финал')
+        search(admin_client, url, q='финал')
+
+    @pytest.mark.parametrize('url', [REVIEWS_URL, COMMENTS_URL])
+    def test_02_query_is_required(self, moderator_client, url):
+        response = moderator_client.get(url)
+        assert response.status_code == 400 and 'q' in response.json(), (
+            'Проверьте, что без параметра `q` поиск возвращает ответ '
+            'со статусом 400.'
+        )
+
+    def test_03_reviews_ranked_by_relevance(self, moderator_client, content):
+        reviews = content['reviews']
+        data = search(moderator_client, REVIEWS_URL, q='елка')
+        assert [item['id'] for item in data['results']] == [
+            reviews['ёлка'].id, reviews['финал'].id
+        ], (
+            'Проверьте, что поиск не различает ё и е, а отзывы с большим '
+            'числом совпадений идут первыми.'
+        )
+        assert data['results'][0] == {
+            'id': reviews['ёлка'].id,
+            'title': content['titles'][0].id,
+            'text': reviews['ёлка'].text,
+            'author': 'TestUser',
+            'score': 5,
+            'pub_date': data['results'][0]['pub_date'],
+        }
+        assert search_ids(moderator_client, REVIEWS_URL, q='фин муз') == [
+            reviews['финал'].id
+        ]
+        assert search_ids(moderator_client, REVIEWS_URL, q='NEAR(') == []
+
+    def test_04_review_filters(self, moderator_client, content):
+        reviews, titles = content['reviews'], content['titles']
+        assert search_ids(moderator_client, REVIEWS_URL, q='финал',
+                          title=titles[1].id) == [reviews['other'].id]
+        assert set(search_ids(moderator_client, REVIEWS_URL, q='финал',
+                              author='TestUser')) == {
+            reviews['ёлка'].id, reviews['other'].id
+        }
+        assert search_ids(moderator_client, REVIEWS_URL, q='финал',
+                          until='2021-01-01T00:00:00Z') == [
+            reviews['other'].id
+        ], 'Проверьте фильтр по дате публикации `until`.'
+        assert reviews['other'].id not in search_ids(
+            moderator_client, REVIEWS_URL, q='финал',
+            since='2021-01-01T00:00:00Z',
+        ), 'Проверьте фильтр по дате публикации `since`.'
+
+    def test_05_comments(self, moderator_client, content):
+        comments, reviews = content['comments'], content['reviews']
+        data = search(moderator_client, COMMENTS_URL, q='елки')
+        assert [item['id'] for item in data['results']] == [
+            comments['спам'].id
+        ]
+        assert data['results'][0]['review'] == reviews['ёлка'].id
+        assert data['results'][0]['title'] == content['titles'][0].id
+        assert search_ids(moderator_client, COMMENTS_URL, q='финал',
+                          title=content['titles'][1].id,
+                          author='TestAdmin') == [comments['ответ'].id]
+        assert search_ids(moderator_client, COMMENTS_URL, q='финал',
+                          review=reviews['ёлка'].id) == []
+
+    def test_06_keyset_pagination(self, moderator_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(title=title, author=user, score=5,
+                                       text='Отзыв')
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user,
+                    text='слово ' * (i % 4 + 1) + 'прочее ' * (i % 3))
+            for i in range(25)
+        )
+        expected = search_ids(moderator_client, COMMENTS_URL, q='слово',
+                              limit=100)
+        assert len(expected) == 25
+        ids, url, params = [], COMMENTS_URL, {'q': 'слово', 'limit': 4}
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = moderator_client.get(url, data=params)
+            assert response.status_code == 200
+            sql = ' '.join(query['sql'] for query in context)
+            assert 'COUNT(' not in sql, (
+                'Проверьте, что страницы поиска не считают COUNT(*).'
+            )
+            ids += [item['id'] for item in response.json()['results']]
+            url, params = response.json()['next'], None
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация возвращает все результаты '
+            'в порядке релевантности без повторов и пропусков.'
+        )
+
+    def test_07_index_follows_changes(self, moderator_client, content):
+        reviews, comments = content['reviews'], content['comments']
+        review = reviews['ёлка']
+        review.text = 'Теперь про снег'
+        review.save()
+        assert search_ids(moderator_client, REVIEWS_URL, q='елка') == [
+            reviews['финал'].id
+        ]
+        assert search_ids(moderator_client, REVIEWS_URL, q='снег') == [
+            review.id
+        ]
+        Comment.objects.filter(pk=comments['ответ'].pk).update(text='Снег')
+        assert search_ids(moderator_client, COMMENTS_URL, q='снег') == [
+            comments['ответ'].id
+        ]
+        content['titles'][0].delete()
+        assert search_ids(moderator_client, REVIEWS_URL, q='снег') == []
+        assert search_ids(moderator_client, COMMENTS_URL, q='елки') == [], (
+            'Проверьте, что каскадное удаление убирает отзывы и комментарии '
+            'из индекса.'
+        )
+
+    def test_08_rebuild_command(self, moderator_client, content):
+        with connection.cursor() as cursor:
+            for name in ('review', 'comment'):
+                for statement in drop_sql(INDEXES[name]) + create_sql(
+                    INDEXES[name]
+                ):
+                    cursor.execute(statement)
+        assert search_ids(moderator_client, REVIEWS_URL, q='финал') == []
+        call_command('rebuild_search_index', 'review')
+        assert len(search_ids(moderator_client, REVIEWS_URL,
+                              q='финал')) == 3
+        assert search_ids(moderator_client, COMMENTS_URL, q='финал') == []
+        call_command('rebuild_search_index')
+        assert search_ids(moderator_client, COMMENTS_URL, q='финал') == [
+            content['comments']['ответ'].id
+        ]
+        assert search_ids(moderator_client, '/api/v1/titles/',
+                          search='произведение 1') == [
+            content['titles'][1].id
+        ], 'Проверьте, что команда пересоздаёт и индекс произведений.'
+        with pytest.raises(CommandError):
+            call_command('rebuild_search_index', 'unknown')
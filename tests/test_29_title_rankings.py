@@ -0,0 +1,170 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.rankings import top_score, trending_score
+
+TOP_URL = '/api/v1/titles/top/'
+TRENDING_URL = '/api/v1/titles/trending/'
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def titles(authors):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    titles = {
+        name: Title.objects.create(name=name, year=2000, category=category)
+        for name in ('single_ten', 'many_nines', 'single_two', 'unrated')
+    }
+    titles['many_nines'].genre.set([genre])
+    Review.objects.create(title=titles['single_ten'], author=authors[0],
+                          score=10, text='Отлично')
+    for author in authors:
+        Review.objects.create(title=titles['many_nines'], author=author,
+                              score=9, text='Хорошо')
+    Review.objects.create(title=titles['single_two'], author=authors[0],
+                          score=2, text='Плохо')
+    return titles
+
+
+def set_pub_date(review_ids, days_ago):
+    Review.objects.filter(pk__in=review_ids).update(
+        pub_date=timezone.now() - datetime.timedelta(days=days_ago)
+    )
+
+
+def get_ids(client, url, **params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, data=params)
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    assert not any('reviews_review' in query['sql'] for query in context), (
+        f'Проверьте, что `{url}` читает предрасчитанные рейтинги, '
+        'а не таблицу отзывов.'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29TitleRankings:
+
+    def test_01_top_uses_bayesian_average(self, client, titles):
+        assert get_ids(client, TOP_URL) == [
+            titles['many_nines'].id, titles['single_ten'].id,
+            titles['single_two'].id,
+        ], (
+            'Проверьте, что `/titles/top/` упорядочен по байесовскому '
+            'среднему: много оценок 9 выше одной оценки 10, а '
+            'произведений без отзывов в списке нет.'
+        )
+        response = client.get(TOP_URL, data={'fields': 'name,rating'})
+        assert response.json()['results'][0] == {
+            'name': 'many_nines', 'rating': 9
+        }
+
+    def test_02_filters(self, client, titles):
+        assert get_ids(client, TOP_URL, genre='drama') == [
+            titles['many_nines'].id
+        ]
+        assert len(get_ids(client, TOP_URL, category='movie')) == 3
+        assert get_ids(client, TRENDING_URL, genre='drama') == [
+            titles['many_nines'].id
+        ], 'Проверьте фильтры по жанру и категории для списков рейтингов.'
+
+    def test_03_trending_decays_with_time(self, client, titles):
+        set_pub_date(titles['many_nines'].reviews.values('pk'), 20)
+        set_pub_date(titles['single_two'].reviews.values('pk'), 40)
+        call_command('rebuild_rankings')
+        assert get_ids(client, TRENDING_URL) == [
+            titles['single_ten'].id, titles['many_nines'].id
+        ], (
+            'Проверьте, что свежий отзыв весит больше трёх отзывов '
+            'двухнедельной давности, а произведения без недавних '
+            'отзывов не попадают в `/titles/trending/`.'
+        )
+        set_pub_date(titles['many_nines'].reviews.values('pk'), 1)
+        call_command('rebuild_rankings')
+        assert get_ids(client, TRENDING_URL)[0] == titles['many_nines'].id
+
+    def test_04_rankings_follow_reviews(self, client, user_client, titles):
+        unrated = titles['unrated']
+        url = f'/api/v1/titles/{unrated.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Шедевр',
+                                               'score': 10})
+        assert response.status_code == 201
+        assert unrated.id in get_ids(client, TOP_URL), (
+            'Проверьте, что новый отзыв сразу обновляет рейтинги.'
+        )
+        assert get_ids(client, TRENDING_URL)[0] == titles['many_nines'].id
+        review_url = f'{url}{response.json()["id"]}/'
+        assert user_client.patch(
+            review_url, data={'score': 1}
+        ).status_code == 200
+        assert get_ids(client, TOP_URL)[-1] == unrated.id
+        assert user_client.delete(review_url).status_code == 204
+        assert unrated.id not in get_ids(client, TOP_URL)
+        assert unrated.id not in get_ids(client, TRENDING_URL)
+
+    def test_05_cursor_pagination(self, client, titles):
+        expected = get_ids(client, TOP_URL)
+        ids, url, params = [], TOP_URL, {'cursor': '', 'limit': 1}
+        while url:
+            response = client.get(url, data=params)
+            assert response.status_code == 200
+            ids += [title['id'] for title in response.json()['results']]
+            url, params = response.json()['next'], None
+        assert ids == expected
+
+    def test_06_rebuild_and_cascades(self, client, titles, authors):
+        Title.objects.update(score_sum=0, review_count=0,
+                             trending_score=None, last_review_at=None)
+        assert get_ids(client, TOP_URL) == []
+        call_command('rebuild_rankings')
+        assert len(get_ids(client, TOP_URL)) == 3, (
+            'Проверьте, что команда `rebuild_rankings` заново строит '
+            'рейтинги по существующим отзывам.'
+        )
+        titles['many_nines'].delete()
+        authors[0].delete()
+        assert get_ids(client, TOP_URL) == []
+        assert get_ids(client, TRENDING_URL) == []
+
+    def test_07_incremental_scores_match_rebuild(self, user_client, titles,
+                                                 authors):
+        title = titles['many_nines']
+        set_pub_date(title.reviews.filter(author=authors[0]).values('pk'), 3)
+        call_command('rebuild_rankings')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 4})
+        assert response.status_code == 201
+        title.reviews.get(author=authors[1]).delete()
+        pub_dates = list(title.reviews.values_list('pub_date', flat=True))
+        title.refresh_from_db()
+        assert title.top_score == pytest.approx(top_score(22, 3))
+        assert title.trending_score == pytest.approx(
+            trending_score(pub_dates)
+        ), (
+            'Проверьте, что создание и удаление отзыва обновляют '
+            'оценки рейтингов так же, как полный пересчёт.'
+        )
+        assert title.last_review_at == max(pub_dates)
+        for review in title.reviews.all():
+            review.delete()
+        title.refresh_from_db()
+        assert title.trending_score is None